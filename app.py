@@ -1,15 +1,24 @@
+import asyncio
+import hashlib
 import logging
 import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 from typing import Dict, List, Optional, Tuple
 
 import gradio as gr
 import jwt
+from cachetools import LRUCache, TTLCache
 from dotenv import load_dotenv
-from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy import func, or_, select, update
+from sqlalchemy.exc import IntegrityError, SQLAlchemyError
 
-from database import Conversation, DatabaseManager, User, init_database
-from voice_personal_assistant import VoiceInteractionResult, VoicePersonalAssistant
+from calendar_service import warm_calendar_service
+from database import Conversation, DatabaseManager, User
+from run_voice_agent import warmup_voice_agent
+from voice_personal_assistant import VoiceInteractionResult, VoicePersonalAssistant, prebuild_tts_cache
 
 load_dotenv()
 
@@ -21,10 +30,23 @@ logger = logging.getLogger(__name__)
 
 SECRET_KEY = os.getenv("SECRET_KEY", "replace-me")
 ALGORITHM = "HS256"
+_SECRET_KEY_BYTES = SECRET_KEY.encode("utf8")
+# PyJWT enforces exp itself; requiring it rejects tokens minted without one.
+_DECODE_OPTIONS = {"verify_signature": True, "verify_exp": True, "require": ["exp"]}
+_DECODE_ALGORITHMS = [ALGORITHM]
 ACCESS_TOKEN_EXPIRE_MINUTES = int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", "1440"))
-
+# Decoded tokens are cached for this many seconds; 0 disables the cache.
+JWT_CACHE_TTL_SECONDS = int(os.getenv("JWT_CACHE_TTL_SECONDS", "0"))
+JWT_CACHE_MAXSIZE = 10000
+USER_CACHE_TTL_SECONDS = int(os.getenv("USER_CACHE_TTL_SECONDS", "60"))
+USER_CACHE_MAXSIZE = 5000
+ASSISTANT_CACHE_MAXSIZE = 128
+# Worker threads behind asyncio.to_thread (the stdlib default is min(32, cpu_count + 4)).
+THREAD_POOL_SIZE = int(os.getenv("THREAD_POOL_SIZE", "64"))
+
+# Creates the tables on first construction.
 db_manager = DatabaseManager()
-init_database()
+warm_calendar_service()
 
 
 class AuthenticationError(Exception):
@@ -32,150 +54,262 @@ class AuthenticationError(Exception):
 
 
 class AuthenticationManager:
+    def __init__(self, cache_ttl_seconds: int = JWT_CACHE_TTL_SECONDS) -> None:
+        # Keyed by sha256(token) so raw bearer tokens are never held in memory.
+        self._token_cache: Optional[TTLCache] = (
+            TTLCache(maxsize=JWT_CACHE_MAXSIZE, ttl=cache_ttl_seconds) if cache_ttl_seconds > 0 else None
+        )
+        self._token_cache_lock = threading.Lock()
+
     def create_access_token(self, data: Dict, expires_delta: Optional[timedelta] = None) -> str:
         payload = data.copy()
         expire = datetime.utcnow() + (expires_delta or timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES))
         payload.update({"exp": expire})
-        return jwt.encode(payload, SECRET_KEY, algorithm=ALGORITHM)
+        return jwt.encode(payload, _SECRET_KEY_BYTES, algorithm=ALGORITHM)
 
     def verify_token(self, token: str) -> Dict:
+        cache_key = None
+        if self._token_cache is not None:
+            cache_key = hashlib.sha256(token.encode("utf8")).hexdigest()
+            with self._token_cache_lock:
+                cached = self._token_cache.get(cache_key)
+            if cached is not None:
+                if cached["exp"] <= time.time():
+                    raise AuthenticationError("Token expired.")
+                return dict(cached)
+
         try:
-            decoded_token = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-            if datetime.fromtimestamp(decoded_token["exp"]) <= datetime.utcnow():
-                raise AuthenticationError("Token expired.")
-            return decoded_token
+            decoded_token = jwt.decode(
+                token, _SECRET_KEY_BYTES, algorithms=_DECODE_ALGORITHMS, options=_DECODE_OPTIONS, leeway=0
+            )
+        except jwt.ExpiredSignatureError as exc:
+            raise AuthenticationError("Token expired.") from exc
         except jwt.PyJWTError as exc:
             raise AuthenticationError("Token is invalid.") from exc
 
+        # Only successfully verified tokens reach the cache.
+        if cache_key is not None:
+            with self._token_cache_lock:
+                self._token_cache[cache_key] = dict(decoded_token)
+        return decoded_token
+
 
 auth_manager = AuthenticationManager()
 
+# Plain user dicts keyed by user id; ORM instances never leave their session.
+_user_cache: TTLCache = TTLCache(maxsize=USER_CACHE_MAXSIZE, ttl=USER_CACHE_TTL_SECONDS)
+_user_cache_lock = threading.Lock()
+
+
+# Assistants are stateless between turns, so one instance per user is reused.
+# Only touched from the event loop, hence no lock.
+_assistant_cache = LRUCache(maxsize=ASSISTANT_CACHE_MAXSIZE)
+
 
 def register_user(username: str, email: str, password: str, confirm_password: str) -> Dict:
     if not username or len(username) < 3 or len(username) > 20 or not username.replace("_", "").isalnum():
         return {"success": False, "message": "Username must be 3-20 characters and alphanumeric."}
+    if not email or "@" not in email:
+        return {"success": False, "message": "Please provide a valid email address."}
     if password != confirm_password:
         return {"success": False, "message": "Passwords do not match."}
     if len(password) < 8:
         return {"success": False, "message": "Password must be at least 8 characters long."}
 
     with db_manager.get_session() as session:
-        existing = (
-            session.query(User)
-            .filter((User.username == username) | (User.email == email))
-            .one_or_none()
-        )
-        if existing:
-            return {"success": False, "message": "An account with that username or email already exists."}
-
         try:
+            # The unique constraints on username/email reject duplicates atomically.
             user = User(username=username, email=email, password_hash=User.hash_password(password))
             session.add(user)
-            logger.info("Registered new user %s", username)
-            return {"success": True, "message": "Registration successful. You can log in now."}
+            session.flush()
+        except IntegrityError as exc:
+            session.rollback()
+            # Only a clash on username/email is a duplicate; any other constraint is a real failure.
+            existing = session.execute(
+                select(User.id).where(or_(User.username == username, User.email == email))
+            ).first()
+            if existing is not None:
+                return {"success": False, "message": "An account with that username or email already exists."}
+            logger.error("Registration failed: %s", exc, exc_info=True)
+            return {"success": False, "message": "Registration failed. Please try again."}
         except SQLAlchemyError as exc:
+            session.rollback()
             logger.error("Registration failed: %s", exc, exc_info=True)
             return {"success": False, "message": "Registration failed. Please try again."}
 
+        logger.info("Registered new user %s", username)
+        return {"success": True, "message": "Registration successful. You can log in now."}
+
 
 def user_login(username_or_email: str, password: str) -> Dict:
     with db_manager.get_session() as session:
-        user = (
-            session.query(User)
-            .filter((User.username == username_or_email) | (User.email == username_or_email))
-            .one_or_none()
-        )
+        # Usernames are restricted to [A-Za-z0-9_], so an '@' can only mean an email.
+        if "@" in username_or_email:
+            user = session.execute(select(User).where(User.email == username_or_email)).scalar_one_or_none()
+        else:
+            user = session.execute(select(User).where(User.username == username_or_email)).scalar_one_or_none()
+            if user is None:
+                # Accounts created before emails were validated may have one without an '@'.
+                user = session.execute(select(User).where(User.email == username_or_email)).scalar_one_or_none()
         if user and user.verify_password(password):
-            token = auth_manager.create_access_token({"sub": user.username})
-            user.last_login = datetime.utcnow()
+            # The login timestamp and any pending rehash go out as a single UPDATE.
+            values = {"last_login": func.now()}
+            if user.needs_rehash():
+                values["password_hash"] = User.hash_password(password)
+            session.execute(update(User).where(User.id == user.id).values(**values))
+            token = auth_manager.create_access_token({"sub": user.username, "uid": user.id})
+            with _user_cache_lock:
+                _user_cache.pop(user.id, None)
             return {"success": True, "access_token": token, "username": user.username, "user_id": user.id}
     return {"success": False, "message": "Invalid username, email, or password."}
 
 
+_CONVERSATION_SUMMARY_COLUMNS = (Conversation.timestamp, Conversation.user_message, Conversation.ai_response)
+
+
+def _cached_user(user_id: Optional[int]) -> Optional[Dict]:
+    if user_id is None:
+        return None
+    with _user_cache_lock:
+        cached = _user_cache.get(user_id)
+    return dict(cached) if cached is not None else None
+
+
+def _cache_user(user: User) -> Dict:
+    user_info = {"id": user.id, "username": user.username, "email": user.email, "is_active": user.is_active}
+    with _user_cache_lock:
+        _user_cache[user.id] = user_info
+    return dict(user_info)
+
+
 def get_user_from_token(token: str) -> Dict:
     if not token:
         raise AuthenticationError("Missing access token. Please log in.")
 
     decoded = auth_manager.verify_token(token)
-    username = decoded.get("sub")
+    cached = _cached_user(decoded.get("uid"))
+    if cached is not None:
+        return cached
 
     with db_manager.get_session() as session:
-        user = session.query(User).filter_by(username=username).one_or_none()
+        user = session.execute(select(User).where(User.username == decoded.get("sub"))).scalar_one_or_none()
         if not user:
             raise AuthenticationError("User not found.")
-        return {"id": user.id, "username": user.username, "email": user.email, "is_active": user.is_active}
+        return _cache_user(user)
+
 
+def get_dashboard_data(token: str, limit: int = 5) -> Tuple[Dict, List[Tuple[datetime, str, str]]]:
+    """Resolve the token's user and their latest conversations in a single query."""
+    if not token:
+        raise AuthenticationError("Missing access token. Please log in.")
+
+    decoded = auth_manager.verify_token(token)
+    cached = _cached_user(decoded.get("uid"))
+    if cached is not None:
+        return cached, get_recent_conversations(cached["id"], limit=limit)
 
-def get_recent_conversations(user_id: int, limit: int = 5) -> List[Conversation]:
     with db_manager.get_session() as session:
-        return (
-            session.query(Conversation)
-            .filter_by(user_id=user_id)
+        rows = session.execute(
+            select(User, *_CONVERSATION_SUMMARY_COLUMNS)
+            .outerjoin(Conversation, Conversation.user_id == User.id)
+            .where(User.username == decoded.get("sub"))
             .order_by(Conversation.timestamp.desc())
             .limit(limit)
-            .all()
-        )
+        ).all()
+        if not rows:
+            raise AuthenticationError("User not found.")
+        user_info = _cache_user(rows[0][0])
+    return user_info, [tuple(row[1:]) for row in rows if row.timestamp is not None]
 
 
-def register_interface(username, email, password, confirm_password, terms) -> str:
+def get_recent_conversations(user_id: int, limit: int = 5) -> List[Tuple[datetime, str, str]]:
+    """Return (timestamp, user_message, ai_response) rows, newest first."""
+    with db_manager.get_session() as session:
+        return session.execute(
+            select(*_CONVERSATION_SUMMARY_COLUMNS)
+            .where(Conversation.user_id == user_id)
+            .order_by(Conversation.timestamp.desc())
+            .limit(limit)
+        ).all()
+
+
+async def register_interface(username, email, password, confirm_password, terms) -> str:
+    _install_default_executor()
     if not terms:
         return "You must accept the terms of service."
-    result = register_user(username, email, password, confirm_password)
+    result = await asyncio.to_thread(register_user, username, email, password, confirm_password)
     return result["message"]
 
 
-def login_interface(username_or_email, password) -> Tuple[str, Optional[str], Optional[str]]:
-    result = user_login(username_or_email, password)
+async def login_interface(username_or_email, password) -> Tuple[str, Optional[str], Optional[str]]:
+    _install_default_executor()
+    result = await asyncio.to_thread(user_login, username_or_email, password)
     if result["success"]:
         greeting = f"Welcome back, {result['username']}!"
         return greeting, result["access_token"], result["username"]
     return result["message"], None, None
 
 
-def dashboard_interface(access_token) -> str:
+async def dashboard_interface(access_token) -> str:
+    _install_default_executor()
     try:
-        user = get_user_from_token(access_token)
+        user, conversations = await asyncio.to_thread(get_dashboard_data, access_token, 5)
     except AuthenticationError as exc:
         return str(exc)
 
-    conversations = get_recent_conversations(user["id"], limit=5)
     if not conversations:
         return f"Welcome to your dashboard, {user['username']}! No recent activity yet."
 
-    lines = [f"Welcome to your dashboard, {user['username']}!", "", "Recent conversations:"]
-    for convo in conversations:
-        timestamp = convo.timestamp.strftime("%b %d %I:%M %p")
-        lines.append(f"[{timestamp}] You: {convo.user_message}")
-        lines.append(f" - Assistant: {convo.ai_response}")
-    return "\n".join(lines)
+    header = f"Welcome to your dashboard, {user['username']}!\n\nRecent conversations:\n"
+    return header + "\n".join(
+        [
+            f"[{timestamp:%b %d %I:%M %p}] You: {user_message}\n - Assistant: {ai_response}"
+            for timestamp, user_message, ai_response in conversations
+        ]
+    )
+
+
+_CALENDAR_JSON_KEYS = ("summary", "start", "end", "location", "status", "htmlLink")
 
 
 def _format_calendar_for_json(events: List[Dict]) -> List[Dict]:
-    formatted = []
-    for event in events:
-        formatted.append(
-            {
-                "summary": event.get("summary"),
-                "start": event.get("start"),
-                "end": event.get("end"),
-                "location": event.get("location"),
-                "status": event.get("status"),
-                "htmlLink": event.get("htmlLink"),
-            }
-        )
-    return formatted
+    return [{key: event.get(key) for key in _CALENDAR_JSON_KEYS} for event in events]
 
 
 def _format_notifications_for_json(items: List[Dict]) -> List[Dict]:
-    formatted = []
-    for item in items:
-        formatted.append({"channel": item.get("channel"), "status": item.get("result")})
-    return formatted
+    return [{"channel": item.get("channel"), "status": item.get("result")} for item in items]
+
+
+def _get_assistant(user_id: int) -> VoicePersonalAssistant:
+    assistant = _assistant_cache.get(user_id)
+    if assistant is None:
+        assistant = VoicePersonalAssistant(user_id=user_id)
+        _assistant_cache[user_id] = assistant
+    return assistant
+
+
+def _result_to_outputs(result: VoiceInteractionResult, audio_chunk: Optional[str] = None) -> Tuple:
+    errors = "\n".join(result.errors) if result.errors else ""
+    calendar_json = _format_calendar_for_json(result.calendar_events)
+    notification_json = _format_notifications_for_json(result.notifications)
+    confidence_pct = round(result.confidence * 100, 1)
+
+    return (
+        result.transcription,
+        result.response_text,
+        audio_chunk,
+        calendar_json,
+        notification_json,
+        result.intent,
+        confidence_pct,
+        errors,
+    )
 
 
 async def voice_assistant_interface(audio_input, access_token):
+    _install_default_executor()
     if not access_token:
-        return (
+        yield (
             "Authentication required.",
             "Please log in to use the voice assistant.",
             None,
@@ -185,8 +319,9 @@ async def voice_assistant_interface(audio_input, access_token):
             0.0,
             "You must log in before using the assistant.",
         )
+        return
     if not audio_input:
-        return (
+        yield (
             "",
             "Please provide an audio recording to process.",
             None,
@@ -196,11 +331,12 @@ async def voice_assistant_interface(audio_input, access_token):
             0.0,
             "",
         )
+        return
 
     try:
-        user = get_user_from_token(access_token)
+        user = await asyncio.to_thread(get_user_from_token, access_token)
     except AuthenticationError as exc:
-        return (
+        yield (
             "",
             str(exc),
             None,
@@ -210,24 +346,47 @@ async def voice_assistant_interface(audio_input, access_token):
             0.0,
             str(exc),
         )
+        return
+
+    assistant = _get_assistant(user["id"])
+    # Each stage (transcription, response, audio) is pushed to the UI as soon as it completes.
+    # The audio output is a stream: every sentence is queued for playback once it is synthesized.
+    streamed = 0
+    async for result in assistant.stream_audio(audio_input):
+        new_segments = result.audio_segments[streamed:]
+        streamed = len(result.audio_segments)
+        if not new_segments and result.audio_path and not streamed:
+            new_segments = [result.audio_path]
+        if not new_segments:
+            yield _result_to_outputs(result)
+        for segment in new_segments:
+            yield _result_to_outputs(result, segment)
+
+
+_default_executor_installed = False
+
+
+def _install_default_executor() -> None:
+    """Size the event loop's to_thread pool for several users' DB and file work at once.
+
+    Called from every entry point, since API clients never trigger the page-load warm-up.
+    """
+    global _default_executor_installed
+    if _default_executor_installed:
+        return
+    _default_executor_installed = True
+    asyncio.get_running_loop().set_default_executor(
+        ThreadPoolExecutor(max_workers=THREAD_POOL_SIZE, thread_name_prefix="hiya")
+    )
 
-    assistant = VoicePersonalAssistant(user_id=user["id"])
-    result: VoiceInteractionResult = await assistant.handle_audio(audio_input)
 
-    errors = "\n".join(result.errors) if result.errors else ""
-    calendar_json = _format_calendar_for_json(result.calendar_events)
-    notification_json = _format_notifications_for_json(result.notifications)
-    confidence_pct = round(result.confidence * 100, 1)
-
-    return (
-        result.transcription,
-        result.response_text,
-        result.audio_path,
-        calendar_json,
-        notification_json,
-        result.intent,
-        confidence_pct,
-        errors,
+async def warmup() -> None:
+    """Pay connection setup, SQL compilation and canned TTS before the first real request."""
+    _install_default_executor()
+    await asyncio.gather(
+        warmup_voice_agent(),
+        asyncio.to_thread(get_recent_conversations, 0, 1),
+        prebuild_tts_cache(),
     )
 
 
@@ -294,7 +453,9 @@ def build_interface() -> gr.Blocks:
 
                 transcription_output = gr.Textbox(label="Transcription", interactive=False, lines=2)
                 response_output = gr.Textbox(label="Assistant Response", interactive=False, lines=4)
-                audio_output = gr.Audio(label="Assistant Audio", type="filepath", interactive=False, autoplay=True)
+                audio_output = gr.Audio(
+                    label="Assistant Audio", type="filepath", interactive=False, streaming=True, autoplay=True
+                )
 
                 with gr.Accordion("Action Details", open=False):
                     intent_output = gr.Textbox(label="Detected Intent", interactive=False)
@@ -335,6 +496,9 @@ def build_interface() -> gr.Blocks:
 
         gr.Markdown("---\n Hiya Hiya-Voice-Concierge")
 
+        # Runs on the server's event loop, so the warmed connections are the ones requests reuse.
+        demo.load(fn=warmup, inputs=None, outputs=None)
+
     return demo
 
 
@@ -342,4 +506,8 @@ app = build_interface()
 
 
 if __name__ == "__main__":
-    app.launch(share=False, server_port=int(os.getenv("PORT", "7860")))
+    app.launch(
+        share=False,
+        server_port=int(os.getenv("PORT", "7860")),
+        max_threads=int(os.getenv("GRADIO_MAX_THREADS", "40")),
+    )
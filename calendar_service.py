@@ -1,21 +1,86 @@
 import json
 import logging
 import os
+import threading
 from datetime import datetime, timedelta
 from functools import lru_cache
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Tuple
+
+from cachetools.func import ttl_cache
 
 logger = logging.getLogger(__name__)
 
 
 try:
+    import google_auth_httplib2
+    import httplib2
     from google.oauth2 import service_account
     from googleapiclient.discovery import build
 except ImportError:  # pragma: no cover - optional dependency
+    google_auth_httplib2 = None
+    httplib2 = None
     service_account = None
     build = None
 
 
+@lru_cache(maxsize=4)
+def _load_credentials(credentials_path: str, delegated_user: Optional[str], scopes: Tuple[str, ...]):
+    credentials = service_account.Credentials.from_service_account_file(credentials_path, scopes=list(scopes))
+    if delegated_user:
+        credentials = credentials.with_subject(delegated_user)
+    return credentials
+
+
+@lru_cache(maxsize=4)
+def _build_calendar_service(credentials_path: str, delegated_user: Optional[str], scopes: Tuple[str, ...]):
+    """Build the Calendar service once per credential set and share it across clients."""
+    credentials = _load_credentials(credentials_path, delegated_user, scopes)
+    return build("calendar", "v3", credentials=credentials, cache_discovery=False)
+
+
+# httplib2 transports are not thread-safe; each worker thread keeps its own authorized one.
+_thread_state = threading.local()
+
+
+def _thread_http(credentials_path: str, delegated_user: Optional[str], scopes: Tuple[str, ...]):
+    https = getattr(_thread_state, "https", None)
+    if https is None:
+        https = _thread_state.https = {}
+    key = (credentials_path, delegated_user, scopes)
+    http = https.get(key)
+    if http is None:
+        credentials = _load_credentials(credentials_path, delegated_user, scopes)
+        http = https[key] = google_auth_httplib2.AuthorizedHttp(credentials, http=httplib2.Http())
+    return http
+
+
+@ttl_cache(maxsize=256, ttl=60)
+def _list_events(
+    credentials_path: str,
+    delegated_user: Optional[str],
+    scopes: Tuple[str, ...],
+    calendar_id: str,
+    query: Optional[str],
+    time_min: str,
+    time_max: str,
+    max_results: int,
+) -> List[Dict]:
+    # The built service only constructs the request; the HTTP round trip runs on this thread's transport.
+    service = _build_calendar_service(credentials_path, delegated_user, scopes)
+    events_result = service.events().list(
+        calendarId=calendar_id,
+        timeMin=time_min,
+        timeMax=time_max,
+        singleEvents=True,
+        orderBy="startTime",
+        maxResults=max_results,
+        q=query,
+    ).execute(http=_thread_http(credentials_path, delegated_user, scopes))
+    events = events_result.get("items", [])
+    logger.debug("Fetched %s events from Google Calendar", len(events))
+    return events
+
+
 class GoogleCalendarClient:
     """Wrapper around Google Calendar API with service-account support."""
 
@@ -37,10 +102,8 @@ class GoogleCalendarClient:
                 os.getenv("GOOGLE_SERVICE_ACCOUNT_JSON")
             )
 
-        self._service = None
-
     def is_configured(self) -> bool:
-        return bool(self.credentials_path and service_account and build)
+        return bool(self.credentials_path and service_account and build and google_auth_httplib2)
 
     def _write_embedded_credentials(self, json_payload: str) -> str:
         path = os.path.join(os.getcwd(), ".service_account.json")
@@ -49,24 +112,12 @@ class GoogleCalendarClient:
                 handle.write(json_payload)
         return path
 
-    @lru_cache(maxsize=1)
-    def _get_credentials(self):
+    def _get_service(self):
         if not self.is_configured():
             raise RuntimeError(
                 "Google Calendar credentials are not configured or google-api-python-client is missing."
             )
-        credentials = service_account.Credentials.from_service_account_file(
-            self.credentials_path, scopes=self.SCOPES
-        )
-        if self.delegated_user:
-            credentials = credentials.with_subject(self.delegated_user)
-        return credentials
-
-    def _get_service(self):
-        if self._service is None:
-            credentials = self._get_credentials()
-            self._service = build("calendar", "v3", credentials=credentials, cache_discovery=False)
-        return self._service
+        return _build_calendar_service(self.credentials_path, self.delegated_user, tuple(self.SCOPES))
 
     def list_upcoming_events(
         self,
@@ -78,20 +129,41 @@ class GoogleCalendarClient:
         if not self.is_configured():
             raise RuntimeError("Google Calendar client is not configured.")
 
-        now = datetime.utcnow()
+        # Bucket to the minute so repeated lookups share a cache key within the TTL window.
+        now = datetime.utcnow().replace(second=0, microsecond=0)
         time_min = now.isoformat() + "Z"
         time_max = (now + timedelta(days=within_days)).isoformat() + "Z"
 
-        service = self._get_service()
-        events_result = service.events().list(
-            calendarId=self.calendar_id,
-            timeMin=time_min,
-            timeMax=time_max,
-            singleEvents=True,
-            orderBy="startTime",
-            maxResults=max_results,
-            q=query,
-        ).execute()
-        events = events_result.get("items", [])
-        logger.debug("Fetched %s events from Google Calendar", len(events))
-        return events
+        return list(
+            _list_events(
+                self.credentials_path,
+                self.delegated_user,
+                tuple(self.SCOPES),
+                self.calendar_id,
+                query,
+                time_min,
+                time_max,
+                max_results,
+            )
+        )
+
+
+@lru_cache(maxsize=1)
+def get_calendar_client() -> GoogleCalendarClient:
+    """Process-wide client configured from the environment."""
+    return GoogleCalendarClient()
+
+
+def warm_calendar_service() -> None:
+    """Build the shared Calendar service in the background so the first lookup skips it."""
+    client = get_calendar_client()
+    if not client.is_configured():
+        return
+
+    def _warm() -> None:
+        try:
+            client._get_service()
+        except Exception:  # pragma: no cover - best effort
+            logger.warning("Google Calendar warm-up failed", exc_info=True)
+
+    threading.Thread(target=_warm, name="calendar-warmup", daemon=True).start()
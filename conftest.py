@@ -0,0 +1,14 @@
+import os
+import tempfile
+
+import pytest
+
+# Point every module at a throwaway database before any of them builds its engine.
+os.environ.setdefault("DATABASE_URL", "sqlite:///" + os.path.join(tempfile.mkdtemp(), "test.db"))
+
+
+@pytest.fixture(scope="session")
+def fake_audio_path(tmp_path_factory):
+    audio_path = tmp_path_factory.mktemp("audio") / "sample.wav"
+    audio_path.write_bytes(b"fake-audio")
+    return str(audio_path)
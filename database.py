@@ -1,31 +1,85 @@
 import os
 from contextlib import contextmanager
 from datetime import datetime
-from typing import Generator
+from functools import lru_cache
+from typing import Any, Dict, Generator, List
 
+from argon2 import PasswordHasher
+from argon2.exceptions import InvalidHashError, VerificationError
 from sqlalchemy import (
     Boolean,
     Column,
     DateTime,
     ForeignKey,
+    Index,
     Integer,
     String,
     Text,
     create_engine,
+    event,
+    func,
 )
-from sqlalchemy.orm import declarative_base, relationship, sessionmaker
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import declarative_base, relationship, scoped_session, sessionmaker
+
+try:
+    import bcrypt
+except ImportError:  # pragma: no cover - only needed for legacy hashes
+    bcrypt = None
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional dependency
+    orjson = None
 
 
 DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///voice_assistant.db")
 
-engine_kwargs = {}
-if DATABASE_URL.startswith("sqlite"):
+IS_SQLITE = DATABASE_URL.startswith("sqlite")
+
+# Compiled SQL is cached per engine; sized for the handful of hot statements plus headroom.
+engine_kwargs = {"query_cache_size": int(os.getenv("DB_QUERY_CACHE_SIZE", "1200"))}
+if IS_SQLITE:
     engine_kwargs["connect_args"] = {"check_same_thread": False}
+else:
+    # LIFO checkout keeps the hottest connections (and their server-side caches) in use
+    # and lets surplus connections idle out during quiet periods.
+    engine_kwargs.update(
+        pool_size=int(os.getenv("DB_POOL_SIZE", "20")),
+        max_overflow=int(os.getenv("DB_MAX_OVERFLOW", "30")),
+        pool_pre_ping=True,
+        pool_use_lifo=True,
+        pool_recycle=3600,
+    )
+
+if orjson is not None:
+    # JSON-typed columns encode and decode through orjson instead of the stdlib json module.
+    engine_kwargs.update(
+        json_serializer=lambda value: orjson.dumps(value).decode(),
+        json_deserializer=orjson.loads,
+    )
 
 engine = create_engine(DATABASE_URL, **engine_kwargs)
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, expire_on_commit=False, bind=engine)
+
+if IS_SQLITE:
+
+    @event.listens_for(engine, "connect")
+    def _set_sqlite_pragmas(dbapi_connection, connection_record) -> None:
+        # WAL lets readers proceed while a writer holds the database.
+        cursor = dbapi_connection.cursor()
+        cursor.execute("PRAGMA journal_mode=WAL")
+        cursor.execute("PRAGMA synchronous=NORMAL")
+        cursor.close()
+
+
+SessionLocal = scoped_session(
+    sessionmaker(autocommit=False, autoflush=False, expire_on_commit=False, bind=engine)
+)
 Base = declarative_base()
 
+password_hasher = PasswordHasher(time_cost=2, memory_cost=65536, parallelism=4)
+LEGACY_BCRYPT_PREFIXES = ("$2a$", "$2b$", "$2y$")
+
 
 class User(Base):
     __tablename__ = "users"
@@ -34,7 +88,7 @@ class User(Base):
     username = Column(String, unique=True, index=True, nullable=False)
     email = Column(String, unique=True, index=True, nullable=False)
     password_hash = Column(String, nullable=False)
-    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    created_at = Column(DateTime, default=datetime.utcnow, server_default=func.now(), nullable=False)
     last_login = Column(DateTime)
     is_active = Column(Boolean, default=True)
     preferences_json = Column(Text)
@@ -51,15 +105,24 @@ class User(Base):
     )
 
     def verify_password(self, password: str) -> bool:
-        import bcrypt
+        if self.password_hash.startswith(LEGACY_BCRYPT_PREFIXES):
+            if bcrypt is None:
+                raise RuntimeError("bcrypt is required to verify legacy password hashes. Install bcrypt.")
+            return bcrypt.checkpw(password.encode("utf8"), self.password_hash.encode("utf8"))
+        try:
+            return password_hasher.verify(self.password_hash, password)
+        except (VerificationError, InvalidHashError):
+            return False
 
-        return bcrypt.checkpw(password.encode("utf8"), self.password_hash.encode("utf8"))
+    def needs_rehash(self) -> bool:
+        """True for legacy bcrypt hashes or argon2 hashes with outdated parameters."""
+        if self.password_hash.startswith(LEGACY_BCRYPT_PREFIXES):
+            return True
+        return password_hasher.check_needs_rehash(self.password_hash)
 
     @staticmethod
     def hash_password(password: str) -> str:
-        import bcrypt
-
-        return bcrypt.hashpw(password.encode("utf8"), bcrypt.gensalt(12)).decode("utf8")
+        return password_hasher.hash(password)
 
 
 class Conversation(Base):
@@ -75,6 +138,8 @@ class Conversation(Base):
 
     user = relationship("User", back_populates="conversations")
 
+    __table_args__ = (Index("ix_conversations_user_ts", "user_id", timestamp.desc()),)
+
 
 class UserPreferences(Base):
     __tablename__ = "user_preferences"
@@ -100,6 +165,12 @@ class CalendarEvent(Base):
 
     user = relationship("User", back_populates="calendar_events")
 
+    __table_args__ = (
+        Index("ix_calendar_events_user_start", "user_id", "start_time"),
+        # Conflict target for upsert_calendar_events().
+        Index("uq_calendar_events_user_external", "user_id", "external_id", unique=True),
+    )
+
 
 class Task(Base):
     __tablename__ = "tasks"
@@ -115,16 +186,79 @@ class Task(Base):
 
     user = relationship("User", back_populates="tasks")
 
+    __table_args__ = (Index("ix_tasks_user_due", "user_id", "due_date"),)
+
+
+# Dialects whose INSERT supports ON CONFLICT ... DO UPDATE.
+_UPSERT_INSERTS = {"sqlite": sqlite.insert, "postgresql": postgresql.insert}
+
 
 def init_database() -> None:
     """Create database tables if they do not exist."""
     Base.metadata.create_all(bind=engine)
+    # create_all() skips indexes on tables that already exist, so add any missing ones here.
+    for table in Base.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(bind=engine, checkfirst=True)
+
+
+@lru_cache(maxsize=1)
+def _ensure_db() -> None:
+    """Run init_database() once per process, on first use rather than at import."""
+    init_database()
+
+
+def upsert_calendar_events(session, rows: List[Dict[str, Any]]) -> None:
+    """Insert or refresh calendar events keyed on (user_id, external_id) in a single statement."""
+    insert = _UPSERT_INSERTS.get(session.get_bind().dialect.name)
+    if insert is None:
+        _merge_calendar_events(session, rows)
+        return
+    stmt = insert(CalendarEvent).values(rows)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=["user_id", "external_id"],
+        set_={
+            "title": stmt.excluded.title,
+            "description": func.coalesce(stmt.excluded.description, CalendarEvent.description),
+            "start_time": stmt.excluded.start_time,
+            "end_time": func.coalesce(stmt.excluded.end_time, CalendarEvent.end_time),
+        },
+    )
+    session.execute(stmt)
+
+
+def insert_conversations(session, rows: List[Dict[str, Any]]) -> None:
+    """Insert a batch of conversation rows as one executemany."""
+    session.execute(Conversation.__table__.insert(), rows)
+
+
+def _merge_calendar_events(session, rows: List[Dict[str, Any]]) -> None:
+    # One SELECT for every affected event, then the update/insert split happens in memory.
+    existing = {
+        (record.user_id, record.external_id): record
+        for record in session.query(CalendarEvent).filter(
+            CalendarEvent.user_id.in_({row["user_id"] for row in rows}),
+            CalendarEvent.external_id.in_({row["external_id"] for row in rows}),
+        )
+    }
+    to_add = []
+    for row in rows:
+        record = existing.get((row["user_id"], row["external_id"]))
+        if record:
+            record.title = row["title"]
+            record.description = row["description"] or record.description
+            record.start_time = row["start_time"]
+            record.end_time = row["end_time"] or record.end_time
+        else:
+            to_add.append(CalendarEvent(**row))
+    session.add_all(to_add)
 
 
 class DatabaseManager:
     """Lightweight session manager to ensure proper commit/rollback semantics."""
 
     def __init__(self) -> None:
+        _ensure_db()
         self._Session = SessionLocal
 
     @contextmanager
@@ -137,4 +271,4 @@ class DatabaseManager:
             session.rollback()
             raise
         finally:
-            session.close()
+            self._Session.remove()
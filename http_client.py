@@ -0,0 +1,16 @@
+from typing import Optional
+
+import httpx
+
+HTTP_LIMITS = httpx.Limits(max_keepalive_connections=50)
+HTTP_TIMEOUT = httpx.Timeout(10.0)
+
+_client: Optional[httpx.AsyncClient] = None
+
+
+def get_http_client() -> httpx.AsyncClient:
+    """Process-wide HTTP/2 client, so concurrent outbound calls share pooled connections."""
+    global _client
+    if _client is None or _client.is_closed:
+        _client = httpx.AsyncClient(http2=True, limits=HTTP_LIMITS, timeout=HTTP_TIMEOUT)
+    return _client
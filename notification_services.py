@@ -1,22 +1,67 @@
+import asyncio
 import logging
 import os
+import random
+from functools import lru_cache
 from typing import Dict, Optional
 
 import httpx
 
+from http_client import get_http_client
+
 logger = logging.getLogger(__name__)
 
+# Retries after an HTTP 429, waiting for Retry-After or an exponential backoff with jitter.
+HTTP_MAX_RETRIES = 2
+HTTP_MAX_RETRY_DELAY_SECONDS = 10.0
+
+
+def _retry_delay(response: httpx.Response, attempt: int) -> float:
+    try:
+        delay = float(response.headers["Retry-After"])
+    except (KeyError, ValueError):
+        delay = 0.5 * 2**attempt + random.uniform(0, 0.25)
+    return min(delay, HTTP_MAX_RETRY_DELAY_SECONDS)
+
+
+class _PooledHTTPClient:
+    """Sends every request through one keep-alive AsyncClient, by default the process-wide one."""
 
-class PushoverClient:
+    _client: Optional[httpx.AsyncClient] = None
+    # Bounds in-flight requests per provider; each subclass sets its own.
+    _semaphore: asyncio.Semaphore
+
+    async def _get_client(self) -> httpx.AsyncClient:
+        if self._client is None or self._client.is_closed:
+            self._client = get_http_client()
+        return self._client
+
+    async def _post(self, url: str, **kwargs) -> httpx.Response:
+        client = await self._get_client()
+        for attempt in range(HTTP_MAX_RETRIES + 1):
+            async with self._semaphore:
+                response = await client.post(url, **kwargs)
+            if response.status_code != 429 or attempt == HTTP_MAX_RETRIES:
+                break
+            # Back off outside the semaphore so waiting retries do not block fresh requests.
+            await asyncio.sleep(_retry_delay(response, attempt))
+        response.raise_for_status()
+        return response
+
+
+class PushoverClient(_PooledHTTPClient):
     """Minimal client for the Pushover notification service."""
 
     API_URL = "https://api.pushover.net/1/messages.json"
+    _semaphore = asyncio.Semaphore(int(os.getenv("PUSHOVER_MAX_CONCURRENCY", "8")))
 
     def __init__(
         self,
         app_token: Optional[str] = None,
         user_key: Optional[str] = None,
+        http_client: Optional[httpx.AsyncClient] = None,
     ) -> None:
+        self._client = http_client
         self.app_token = app_token or os.getenv("PUSHOVER_APP_TOKEN")
         self.user_key = user_key or os.getenv("PUSHOVER_USER_KEY")
 
@@ -43,25 +88,30 @@ class PushoverClient:
         if url:
             payload["url"] = url
 
-        async with httpx.AsyncClient(timeout=10) as client:
-            response = await client.post(self.API_URL, data=payload)
-            response.raise_for_status()
-            logger.info("Pushover notification sent")
-            return response.json()
+        response = await self._post(self.API_URL, data=payload)
+        logger.info("Pushover notification sent")
+        return response.json()
 
 
-class SendGridClient:
+class SendGridClient(_PooledHTTPClient):
     """Lightweight SendGrid integration via the REST API."""
 
     API_URL = "https://api.sendgrid.com/v3/mail/send"
+    _semaphore = asyncio.Semaphore(int(os.getenv("SENDGRID_MAX_CONCURRENCY", "8")))
 
     def __init__(
         self,
         api_key: Optional[str] = None,
         default_sender: Optional[str] = None,
+        http_client: Optional[httpx.AsyncClient] = None,
     ) -> None:
+        self._client = http_client
         self.api_key = api_key or os.getenv("SENDGRID_API_KEY")
         self.default_sender = default_sender or os.getenv("SENDGRID_SENDER")
+        self._headers = {
+            "Authorization": f"Bearer {self.api_key}",
+            "Content-Type": "application/json",
+        }
 
     def is_configured(self) -> bool:
         return bool(self.api_key and self.default_sender)
@@ -76,10 +126,6 @@ class SendGridClient:
         if not self.is_configured() and not (self.api_key and sender_email):
             raise RuntimeError("SendGrid credentials or sender email are not configured.")
 
-        headers = {
-            "Authorization": f"Bearer {self.api_key}",
-            "Content-Type": "application/json",
-        }
         payload = {
             "personalizations": [
                 {
@@ -91,9 +137,19 @@ class SendGridClient:
             "content": [{"type": "text/plain", "value": content}],
         }
 
-        async with httpx.AsyncClient(timeout=10) as client:
-            response = await client.post(self.API_URL, headers=headers, json=payload)
-            response.raise_for_status()
-            logger.info("SendGrid email sent to %s", to_email)
-            # SendGrid returns empty body on success; emulate a useful payload
-            return {"status": "queued"}
+        await self._post(self.API_URL, headers=self._headers, json=payload)
+        logger.info("SendGrid email sent to %s", to_email)
+        # SendGrid returns empty body on success; emulate a useful payload
+        return {"status": "queued"}
+
+
+@lru_cache(maxsize=1)
+def get_pushover_client() -> PushoverClient:
+    """Process-wide Pushover client, so every assistant shares one connection pool."""
+    return PushoverClient(http_client=get_http_client())
+
+
+@lru_cache(maxsize=1)
+def get_sendgrid_client() -> SendGridClient:
+    """Process-wide SendGrid client, so every assistant shares one connection pool."""
+    return SendGridClient(http_client=get_http_client())
@@ -1,127 +1,302 @@
 import asyncio
+import inspect
 import json
 import logging
 import os
-from typing import Any, Dict, Optional
+import re
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Final, List, Optional, Sequence
 
+import httpx
+from cachetools import LRUCache
 from dotenv import load_dotenv
 
 try:
-    from openai import OpenAI
+    import orjson
 except ImportError:  # pragma: no cover - optional dependency
-    OpenAI = None
+    orjson = None
+
+try:
+    from openai import AsyncOpenAI
+except ImportError:  # pragma: no cover - optional dependency
+    AsyncOpenAI = None
 
 load_dotenv()
 
 logger = logging.getLogger(__name__)
 
+_json_loads = orjson.loads if orjson is not None else json.loads
+
+
+def _json_dumps(value: Any) -> str:
+    if orjson is not None:
+        return orjson.dumps(value).decode("utf8")
+    return json.dumps(value, ensure_ascii=False, separators=(",", ":"))
+
+
 MODEL_NAME = os.getenv("VOICE_AGENT_MODEL", "gpt-4o-mini")
+OPENAI_TIMEOUT_SECONDS = float(os.getenv("OPENAI_TIMEOUT_SECONDS", "10"))
+MAX_CONCURRENT_REQUESTS = int(os.getenv("VOICE_AGENT_MAX_CONCURRENCY", "8"))
 
 
-def _build_openai_client() -> Optional["OpenAI"]:
+def _build_openai_client() -> Optional["AsyncOpenAI"]:
     api_key = os.getenv("OPENAI_API_KEY")
-    if not api_key or OpenAI is None:
+    if not api_key or AsyncOpenAI is None:
         return None
-    return OpenAI(api_key=api_key)
+    # One long-lived HTTP/2 pool so every intent call reuses the same TLS session.
+    http_client = httpx.AsyncClient(
+        http2=True,
+        timeout=OPENAI_TIMEOUT_SECONDS,
+        limits=httpx.Limits(max_keepalive_connections=32, keepalive_expiry=300),
+    )
+    return AsyncOpenAI(api_key=api_key, http_client=http_client)
 
 
 CLIENT = _build_openai_client()
 
+_SYSTEM_PROMPT: Final[str] = (
+    "You assist a voice-enabled concierge named Hiya Flyer Companion. "
+    "Classify each user utterance into an actionable intent. "
+    "Supported intents: 'calendar_lookup', 'send_email', 'push_notification', "
+    "'smalltalk', 'clarification', 'unknown'. "
+    "When relevant, extract structured parameters such as temporal windows, keywords, "
+    "recipient information, channels (email, push), and any follow up question necessary "
+    "to fulfill the task. "
+    'Each user message is JSON of the form {"id": <int>, "text": <utterance>}. '
+    'Return {"results": [...]} with exactly one entry per message, echoing its id. '
+    "Always respond with JSON that adheres to the provided schema."
+)
 
-async def run_voice_agent(user_message: str, user_id: str = None, context: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
-    """
-    Call the configured LLM to classify the user's request.
+_INTENT_RESULT_SCHEMA: Final[Dict[str, Any]] = {
+    "type": "object",
+    "properties": {
+        "id": {"type": "integer"},
+        "intent": {"type": "string"},
+        "confidence": {"type": "number"},
+        "parameters": {"type": "object"},
+        "follow_up": {
+            "type": ["string", "null"],
+            "description": "Clarifying question if additional information is required.",
+        },
+        "summary": {"type": "string"},
+    },
+    "required": ["id", "intent", "confidence", "parameters"],
+    "additionalProperties": False,
+}
 
-    Returns a JSON structure with the predicted intent and parameters.
-    """
-    if CLIENT is None:
-        return {
-            "intent": "unknown",
-            "confidence": 0.0,
-            "parameters": {},
-            "explanation": "OpenAI client is not configured. Provide OPENAI_API_KEY.",
-        }
-
-    system_prompt = (
-        "You assist a voice-enabled concierge named Hiya Flyer Companion. "
-        "Classify the user's utterance into an actionable intent. "
-        "Supported intents: 'calendar_lookup', 'send_email', 'push_notification', "
-        "'smalltalk', 'clarification', 'unknown'. "
-        "When relevant, extract structured parameters such as temporal windows, keywords, "
-        "recipient information, channels (email, push), and any follow up question necessary "
-        "to fulfill the task. "
-        "Always respond with JSON that adheres to the provided schema."
-    )
+_INTENT_SCHEMA: Final[Dict[str, Any]] = {
+    "name": "intent_batch_schema",
+    "schema": {
+        "type": "object",
+        "properties": {"results": {"type": "array", "items": _INTENT_RESULT_SCHEMA}},
+        "required": ["results"],
+        "additionalProperties": False,
+    },
+}
 
-    schema = {
-        "name": "intent_schema",
-        "schema": {
-            "type": "object",
-            "properties": {
-                "intent": {"type": "string"},
-                "confidence": {"type": "number"},
-                "parameters": {"type": "object"},
-                "follow_up": {
-                    "type": ["string", "null"],
-                    "description": "Clarifying question if additional information is required.",
-                },
-                "summary": {"type": "string"},
-            },
-            "required": ["intent", "confidence", "parameters"],
-            "additionalProperties": False,
-        },
+_RESPONSE_FORMAT: Final[Dict[str, Any]] = {"type": "json_schema", "json_schema": _INTENT_SCHEMA}
+_SYSTEM_MESSAGE: Final[Dict[str, str]] = {"role": "system", "content": _SYSTEM_PROMPT}
+
+
+def _sdk_supports_response_format() -> bool:
+    """Check once, at import, whether the installed SDK's Responses API takes response_format."""
+    if AsyncOpenAI is None:
+        return False
+    try:
+        from openai.resources.responses import AsyncResponses
+
+        return "response_format" in inspect.signature(AsyncResponses.create).parameters
+    except (ImportError, AttributeError, TypeError, ValueError):
+        return False
+
+
+_SUPPORTS_RESPONSE_FORMAT: Final[bool] = _sdk_supports_response_format()
+_PARAMS_BASE: Final[Dict[str, Any]] = (
+    {"model": MODEL_NAME, "response_format": _RESPONSE_FORMAT} if _SUPPORTS_RESPONSE_FORMAT else {"model": MODEL_NAME}
+)
+
+# Matches the first completed "intent" value in a partially streamed reply.
+_PARTIAL_INTENT = re.compile(r'"intent"\s*:\s*"([^"]*)"')
+
+
+# Per-user LRU of classified utterances so one chatty user cannot evict another's entries.
+# The per-user maps are themselves kept in an LRU so memory stays bounded as users accumulate.
+_CACHE_MAX = 1024
+_CACHE_MAX_USERS = 256
+_CACHE_MIN_CONFIDENCE = 0.7
+_cache: LRUCache = LRUCache(maxsize=_CACHE_MAX_USERS)
+
+# Bounds in-flight requests so bursts queue here instead of exhausting the connection pool.
+_REQUEST_SEMAPHORE = asyncio.Semaphore(MAX_CONCURRENT_REQUESTS)
+
+
+# Canonical defaults merged under every parsed result.
+_EMPTY_RESULT: Final[Dict[str, Any]] = {
+    "intent": "unknown",
+    "confidence": 0.0,
+    "parameters": {},
+    "follow_up": None,
+    "summary": "",
+}
+
+
+# Fixed follow-ups for replies that could not be used; callers map the key to pre-rendered audio.
+FOLLOW_UP_PROMPTS: Final[Dict[str, str]] = {
+    "parse_error": "I could not parse the model response. Could you rephrase?",
+    "unexpected_reply": "I received an unexpected reply. Please try again.",
+}
+
+
+def _fallback_result(follow_up_key: str, payload: str) -> Dict[str, Any]:
+    return {
+        **_EMPTY_RESULT,
+        "parameters": {},
+        "follow_up": FOLLOW_UP_PROMPTS[follow_up_key],
+        "follow_up_key": follow_up_key,
+        "summary": payload,
     }
 
-    def _call_openai() -> Dict[str, Any]:
-        params: Dict[str, Any] = {
-            "model": MODEL_NAME,
-            "input": [
-                {"role": "system", "content": system_prompt},
-                {"role": "user", "content": user_message},
-            ],
-        }
-
-        # Some OpenAI client versions do not yet support response_format; retry without it if needed.
-        use_response_format = True
-        params["response_format"] = {"type": "json_schema", "json_schema": schema}
-
-        try:
-            response = CLIENT.responses.create(**params)
-        except TypeError as exc:
-            if "unexpected keyword argument 'response_format'" not in str(exc):
-                raise
-            params.pop("response_format", None)
-            use_response_format = False
-            response = CLIENT.responses.create(**params)
-
-        payload = response.output_text
-
-        if not use_response_format:
-            logger.warning("Voice agent falling back without response_format. Raw output: %s", payload)
-
-        try:
-            data = json.loads(payload)
-        except json.JSONDecodeError:
-            return {
+
+def _parse_batch_payload(payload: str, count: int) -> List[Dict[str, Any]]:
+    """Split a {"results": [...]} reply back into one result per input, in input order."""
+    try:
+        data = _json_loads(payload)
+    except json.JSONDecodeError:  # orjson.JSONDecodeError subclasses this
+        return [_fallback_result("parse_error", payload) for _ in range(count)]
+
+    results = data.get("results") if isinstance(data, dict) else None
+    if results is None and count == 1 and isinstance(data, dict) and "intent" in data:
+        # Without an enforced schema a single utterance may come back as the bare intent object.
+        results = [data]
+    if not isinstance(results, list):
+        return [_fallback_result("unexpected_reply", payload) for _ in range(count)]
+
+    items = [item for item in results if isinstance(item, dict)]
+    if count == 1 and len(items) == 1:
+        by_id = {0: items[0]}
+    else:
+        by_id = {}
+        for item in items:
+            # Models echo the id as 0 or "0" alike.
+            try:
+                by_id[int(item.get("id"))] = item
+            except (TypeError, ValueError):
+                continue
+    parsed: List[Dict[str, Any]] = []
+    for index in range(count):
+        item = by_id.get(index)
+        if item is None:
+            parsed.append(_fallback_result("unexpected_reply", payload))
+            continue
+        # Normalize missing fields so downstream logic doesn't crash when schema isn't enforced.
+        result = {**_EMPTY_RESULT, **item}
+        result.pop("id", None)
+        if "parameters" not in item:
+            result["parameters"] = {}
+        if "summary" not in item:
+            result["summary"] = _json_dumps(item)
+        parsed.append(result)
+    return parsed
+
+
+def _build_params(user_messages: Sequence[str]) -> Dict[str, Any]:
+    user_inputs = [
+        {"role": "user", "content": _json_dumps({"id": index, "text": text})}
+        for index, text in enumerate(user_messages)
+    ]
+    return dict(_PARAMS_BASE, input=[_SYSTEM_MESSAGE, *user_inputs])
+
+
+async def run_voice_agent_batch(user_messages: Sequence[str]) -> List[Dict[str, Any]]:
+    """
+    Classify several utterances with a single LLM request.
+
+    Returns one result per utterance, in the order given.
+    """
+    if not user_messages:
+        return []
+    if CLIENT is None:
+        return [
+            {
                 "intent": "unknown",
                 "confidence": 0.0,
                 "parameters": {},
-                "follow_up": "I could not parse the model response. Could you rephrase?",
-                "summary": payload,
+                "explanation": "OpenAI client is not configured. Provide OPENAI_API_KEY.",
             }
-        else:
-            # Normalize missing fields so downstream logic doesn't crash when schema isn't enforced.
-            if not isinstance(data, dict):
-                return {
-                    "intent": "unknown",
-                    "confidence": 0.0,
-                    "parameters": {},
-                    "follow_up": "I received an unexpected reply. Please try again.",
-                    "summary": payload,
-                }
-            data.setdefault("parameters", {})
-            data.setdefault("confidence", 0.0)
-            data.setdefault("summary", payload)
-            return data
-
-    return await asyncio.to_thread(_call_openai)
+            for _ in user_messages
+        ]
+
+    async with _REQUEST_SEMAPHORE:
+        response = await CLIENT.responses.create(**_build_params(user_messages))
+
+    payload = response.output_text
+    if not _SUPPORTS_RESPONSE_FORMAT:
+        logger.warning("Voice agent falling back without response_format. Raw output: %s", payload)
+    return _parse_batch_payload(payload, len(user_messages))
+
+
+async def _stream_classification(user_message: str, on_intent: Callable[[str], None]) -> Dict[str, Any]:
+    """Classify one utterance over the streaming API, reporting the intent as soon as it is emitted."""
+    buffer = ""
+    announced = False
+    async with _REQUEST_SEMAPHORE:
+        async with CLIENT.responses.stream(**_build_params([user_message])) as stream:
+            async for event in stream:
+                if event.type != "response.output_text.delta":
+                    continue
+                buffer += event.delta
+                if not announced:
+                    match = _PARTIAL_INTENT.search(buffer)
+                    if match:
+                        announced = True
+                        on_intent(match.group(1))
+
+    if not _SUPPORTS_RESPONSE_FORMAT:
+        logger.warning("Voice agent falling back without response_format. Raw output: %s", buffer)
+    return _parse_batch_payload(buffer, 1)[0]
+
+
+_warmed_up = False
+
+
+async def warmup_voice_agent() -> None:
+    """Open the pooled HTTP/2 connection ahead of the first real classification."""
+    global _warmed_up
+    if CLIENT is None or _warmed_up:
+        return
+    _warmed_up = True
+    try:
+        # An authenticated, token-free request: pays DNS + TLS + HTTP/2 setup only.
+        await CLIENT.models.retrieve(MODEL_NAME)
+    except Exception:  # pragma: no cover - best effort
+        logger.warning("Voice agent warm-up failed", exc_info=True)
+
+
+async def run_voice_agent(
+    user_message: str,
+    user_id: str = None,
+    context: Optional[Dict[str, Any]] = None,
+    on_intent: Optional[Callable[[str], None]] = None,
+) -> Dict[str, Any]:
+    """
+    Call the configured LLM to classify the user's request.
+
+    Returns a JSON structure with the predicted intent and parameters. When ``on_intent``
+    is given the reply is streamed and the callback fires as soon as the intent is known.
+    """
+    user_cache = _cache.setdefault(user_id or "anon", OrderedDict())
+    key = " ".join(user_message.lower().split())
+    cached = user_cache.get(key)
+    if cached is not None:
+        user_cache.move_to_end(key)
+        return dict(cached)
+
+    if on_intent is not None and CLIENT is not None:
+        result = await _stream_classification(user_message, on_intent)
+    else:
+        result = (await run_voice_agent_batch([user_message]))[0]
+    if float(result.get("confidence", 0.0)) >= _CACHE_MIN_CONFIDENCE:
+        user_cache[key] = result
+        if len(user_cache) > _CACHE_MAX:
+            user_cache.popitem(last=False)
+    return dict(result)
@@ -0,0 +1,115 @@
+import logging
+import os
+import threading
+import time
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import Any, Dict, FrozenSet, List, Optional
+
+import numpy as np
+
+from run_voice_agent import CLIENT
+
+logger = logging.getLogger(__name__)
+
+EMBEDDING_MODEL = os.getenv("SEMANTIC_CACHE_MODEL", "text-embedding-3-small")
+SIMILARITY_THRESHOLD = float(os.getenv("SEMANTIC_CACHE_THRESHOLD", "0.95"))
+SEMANTIC_CACHE_TTL_SECONDS = float(os.getenv("SEMANTIC_CACHE_TTL_SECONDS", "300"))
+MAX_ENTRIES_PER_USER = 64
+
+# Only replies without side effects may be replayed; a cached send_email would silently not send.
+# calendar_lookup is left out: its events must stay as fresh as the 60 s calendar cache, not this TTL.
+CACHEABLE_INTENTS: FrozenSet[str] = frozenset({"smalltalk"})
+
+
+@dataclass
+class _UserEntries:
+    vectors: np.ndarray
+    expires_at: List[float] = field(default_factory=list)
+    values: List[Dict[str, Any]] = field(default_factory=list)
+
+
+class SemanticCache:
+    """Per-user cache of turn results, matched by cosine similarity of transcription embeddings."""
+
+    def __init__(
+        self,
+        client: Any = CLIENT,
+        model: str = EMBEDDING_MODEL,
+        threshold: float = SIMILARITY_THRESHOLD,
+        ttl_seconds: float = SEMANTIC_CACHE_TTL_SECONDS,
+    ) -> None:
+        self.client = client
+        self.model = model
+        self.threshold = threshold
+        self.ttl_seconds = ttl_seconds
+        self._entries: Dict[int, _UserEntries] = {}
+        self._lock = threading.Lock()
+
+    def is_configured(self) -> bool:
+        return self.client is not None and self.ttl_seconds > 0
+
+    async def embed(self, text: str) -> Optional[np.ndarray]:
+        """Return the unit-length embedding of ``text``, or None if it could not be computed."""
+        try:
+            response = await self.client.embeddings.create(model=self.model, input=text)
+        except Exception as exc:  # pragma: no cover - cache is best effort
+            logger.warning(
+                "Embedding request failed; skipping semantic cache: %s",
+                exc,
+                exc_info=logger.isEnabledFor(logging.DEBUG),
+            )
+            return None
+        vector = np.asarray(response.data[0].embedding, dtype=np.float32)
+        norm = float(np.linalg.norm(vector))
+        return vector / norm if norm else None
+
+    def lookup(self, user_id: int, embedding: Optional[np.ndarray]) -> Optional[Dict[str, Any]]:
+        """Return the stored result most similar to ``embedding`` if it clears the threshold."""
+        if embedding is None:
+            return None
+        with self._lock:
+            entries = self._prune(user_id)
+            if entries is None:
+                return None
+            # Rows are unit vectors, so the dot product is the cosine similarity.
+            scores = entries.vectors @ embedding
+            best = int(np.argmax(scores))
+            if scores[best] < self.threshold:
+                return None
+            return dict(entries.values[best])
+
+    def store(self, user_id: int, embedding: Optional[np.ndarray], value: Dict[str, Any]) -> None:
+        if embedding is None:
+            return
+        with self._lock:
+            entries = self._prune(user_id)
+            expires_at = time.monotonic() + self.ttl_seconds
+            if entries is None:
+                self._entries[user_id] = _UserEntries(embedding[np.newaxis, :], [expires_at], [dict(value)])
+                return
+            entries.vectors = np.vstack((entries.vectors, embedding))[-MAX_ENTRIES_PER_USER:]
+            entries.expires_at = (entries.expires_at + [expires_at])[-MAX_ENTRIES_PER_USER:]
+            entries.values = (entries.values + [dict(value)])[-MAX_ENTRIES_PER_USER:]
+
+    def _prune(self, user_id: int) -> Optional[_UserEntries]:
+        entries = self._entries.get(user_id)
+        if entries is None:
+            return None
+        # Entries are appended in expiry order, so the expired ones form a prefix.
+        now = time.monotonic()
+        live = next((i for i, expires in enumerate(entries.expires_at) if expires > now), None)
+        if live is None:
+            del self._entries[user_id]
+            return None
+        if live:
+            entries.vectors = entries.vectors[live:]
+            entries.expires_at = entries.expires_at[live:]
+            entries.values = entries.values[live:]
+        return entries
+
+
+@lru_cache(maxsize=1)
+def get_semantic_cache() -> SemanticCache:
+    """Process-wide cache; entries are partitioned by user so results never cross accounts."""
+    return SemanticCache()
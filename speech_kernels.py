@@ -0,0 +1,73 @@
+import logging
+import mmap
+import threading
+import wave
+from typing import Optional
+
+import numpy as np
+
+try:
+    from numba import njit
+except ImportError:  # pragma: no cover - optional dependency
+    njit = None
+
+logger = logging.getLogger(__name__)
+
+
+if njit is not None:
+
+    @njit(cache=True, fastmath=True)
+    def rms_energy(pcm: np.ndarray) -> float:
+        """Root-mean-square energy of int16 PCM samples, normalized to [0, 1]."""
+        if pcm.size == 0:
+            return 0.0
+        total = 0.0
+        for sample in pcm:
+            value = sample / 32768.0
+            total += value * value
+        return np.sqrt(total / pcm.size)
+
+else:
+
+    def rms_energy(pcm: np.ndarray) -> float:
+        """Root-mean-square energy of int16 PCM samples, normalized to [0, 1]."""
+        if pcm.size == 0:
+            return 0.0
+        # One float64 copy; the dot product squares and sums without further temporaries.
+        samples = pcm.astype(np.float64)
+        return float(np.sqrt(np.dot(samples, samples) / pcm.size)) / 32768.0
+
+
+def wav_rms_energy(audio_path: str) -> Optional[float]:
+    """Return the RMS energy of a 16-bit PCM WAV file, or None if it cannot be decoded as one."""
+    try:
+        with open(audio_path, "rb") as handle:
+            with wave.open(handle, "rb") as wav_file:
+                if wav_file.getsampwidth() != 2:
+                    return None
+                sample_count = wav_file.getnframes() * wav_file.getnchannels()
+                # wave stops right after the data chunk header, so this is where PCM begins.
+                data_offset = handle.tell()
+            if sample_count == 0:
+                return 0.0
+            # Map the samples instead of copying them onto the Python heap.
+            with mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                sample_count = min(sample_count, (len(mapped) - data_offset) // 2)
+                pcm = np.frombuffer(mapped, dtype=np.int16, count=sample_count, offset=data_offset)
+                energy = float(rms_energy(pcm))
+                del pcm
+            return energy
+    except (wave.Error, EOFError, OSError, ValueError):
+        return None
+
+
+def _prewarm() -> None:
+    try:
+        rms_energy(np.zeros(16, dtype=np.int16))
+    except Exception:  # pragma: no cover - best effort
+        logger.warning("Speech kernel warm-up failed", exc_info=True)
+
+
+# Compile (or load from the on-disk cache) off the request path.
+if njit is not None:
+    threading.Thread(target=_prewarm, name="speech-kernels-warmup", daemon=True).start()
@@ -0,0 +1,86 @@
+import time
+from datetime import timedelta
+
+import bcrypt
+import pytest
+from sqlalchemy import select
+
+import app
+from database import User
+
+
+def _stored_user(username):
+    with app.db_manager.get_session() as session:
+        user = session.execute(select(User).where(User.username == username)).scalar_one()
+        return user.password_hash, user.last_login
+
+
+def test_legacy_bcrypt_hash_is_upgraded_on_login():
+    legacy_hash = bcrypt.hashpw(b"password123", bcrypt.gensalt()).decode("utf8")
+    with app.db_manager.get_session() as session:
+        session.add(User(username="legacy_1", email="legacy@example.com", password_hash=legacy_hash))
+
+    result = app.user_login("legacy_1", "password123")
+
+    assert result["success"]
+    password_hash, last_login = _stored_user("legacy_1")
+    assert password_hash.startswith("$argon2id$")
+    assert last_login is not None
+    # The rewritten hash still verifies.
+    assert app.user_login("legacy@example.com", "password123")["success"]
+
+
+def test_login_rejects_wrong_password():
+    assert app.register_user("wrongpw_1", "wrongpw@example.com", "password123", "password123")["success"]
+
+    result = app.user_login("wrongpw_1", "password124")
+
+    assert not result["success"]
+    assert _stored_user("wrongpw_1")[1] is None
+
+
+def test_register_duplicate_returns_duplicate_message():
+    assert app.register_user("dupe_1", "dupe@example.com", "password123", "password123")["success"]
+
+    by_username = app.register_user("dupe_1", "other@example.com", "password123", "password123")
+    by_email = app.register_user("dupe_2", "dupe@example.com", "password123", "password123")
+
+    assert by_username["message"] == "An account with that username or email already exists."
+    assert by_email["message"] == "An account with that username or email already exists."
+
+
+def test_register_reports_other_integrity_errors(monkeypatch):
+    # A NULL password hash violates NOT NULL, which is not a duplicate account.
+    monkeypatch.setattr(User, "hash_password", staticmethod(lambda password: None))
+
+    result = app.register_user("nullpw_1", "nullpw@example.com", "password123", "password123")
+
+    assert not result["success"]
+    assert result["message"] == "Registration failed. Please try again."
+
+
+def test_cached_token_skips_decode_until_it_expires(monkeypatch):
+    manager = app.AuthenticationManager(cache_ttl_seconds=3600)
+    token = manager.create_access_token({"sub": "cached_1", "uid": 1}, expires_delta=timedelta(minutes=5))
+    assert manager.verify_token(token)["sub"] == "cached_1"
+
+    def fail_decode(*args, **kwargs):
+        raise AssertionError("cache hit should not decode")
+
+    monkeypatch.setattr(app.jwt, "decode", fail_decode)
+    assert manager.verify_token(token)["sub"] == "cached_1"
+
+    # The cache outlives the token, so the hit path must enforce exp itself.
+    now = time.time()
+    monkeypatch.setattr(app.time, "time", lambda: now + 600)
+    with pytest.raises(app.AuthenticationError):
+        manager.verify_token(token)
+
+
+def test_invalid_token_is_not_cached():
+    manager = app.AuthenticationManager(cache_ttl_seconds=3600)
+
+    with pytest.raises(app.AuthenticationError):
+        manager.verify_token("not-a-jwt")
+
+    assert len(manager._token_cache) == 0
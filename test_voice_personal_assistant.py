@@ -1,9 +1,12 @@
 import asyncio
 from unittest.mock import AsyncMock
 
+import numpy as np
 import pytest
 
+import run_voice_agent
 import voice_personal_assistant
+from semantic_cache import SemanticCache
 from voice_personal_assistant import VoiceInteractionResult, VoicePersonalAssistant
 
 
@@ -31,10 +34,7 @@ async def test_handle_audio_transcription_failure(monkeypatch):
 
 
 @pytest.mark.asyncio
-async def test_handle_audio_success_flow(monkeypatch, tmp_path):
-    audio_path = tmp_path / "sample.wav"
-    audio_path.write_bytes(b"fake-audio")
-
+async def test_handle_audio_success_flow(monkeypatch, fake_audio_path):
     assistant = VoicePersonalAssistant(user_id=7)
 
     monkeypatch.setattr(assistant.speech, "transcribe", AsyncMock(return_value="Check my flights next week"))
@@ -62,17 +62,155 @@ async def test_handle_audio_success_flow(monkeypatch, tmp_path):
             }
         ),
     )
-    monkeypatch.setattr(assistant.speech, "synthesize", AsyncMock(return_value=str(audio_path)))
+    monkeypatch.setattr(assistant.speech, "synthesize", AsyncMock(return_value=fake_audio_path))
 
-    result = await assistant.handle_audio(str(audio_path))
+    result = await assistant.handle_audio(fake_audio_path)
 
     assert result.intent == "calendar_lookup"
     assert result.transcription == "Check my flights next week"
     assert result.calendar_events == [{"summary": "Flight to SFO"}]
-    assert result.audio_path == str(audio_path)
+    assert result.audio_path == fake_audio_path
+
+
+@pytest.mark.asyncio
+async def test_stream_audio_yields_each_stage(monkeypatch):
+    assistant = VoicePersonalAssistant(user_id=3)
+
+    monkeypatch.setattr(assistant.speech, "transcribe", AsyncMock(return_value="Hello there"))
+    monkeypatch.setattr(
+        voice_personal_assistant,
+        "run_voice_agent",
+        AsyncMock(return_value={"intent": "smalltalk", "confidence": 0.9, "parameters": {}}),
+    )
+    monkeypatch.setattr(
+        assistant,
+        "_execute_intent",
+        AsyncMock(return_value={"response_text": "Hi!", "calendar_events": [], "notifications": [], "errors": []}),
+    )
+    monkeypatch.setattr(assistant.speech, "synthesize", AsyncMock(return_value="reply.mp3"))
+
+    stages = [result async for result in assistant.stream_audio("sample.wav")]
+
+    assert [stage.transcription for stage in stages] == ["Hello there"] * 4
+    assert [stage.response_text for stage in stages] == ["", "Hi!", "Hi!", "Hi!"]
+    assert [stage.audio_segments for stage in stages] == [[], [], ["reply.mp3"], ["reply.mp3"]]
+    assert [stage.audio_path for stage in stages] == [None, None, None, "reply.mp3"]
+    assert stages[-1].intent == "smalltalk"
+
+
+@pytest.mark.asyncio
+async def test_stream_audio_reports_intent_before_agent_finishes(monkeypatch):
+    assistant = VoicePersonalAssistant(user_id=3)
+    release = asyncio.Event()
+
+    async def fake_agent(message, user_id=None, on_intent=None):
+        on_intent("calendar_lookup")
+        await release.wait()
+        return {"intent": "calendar_lookup", "confidence": 0.9, "parameters": {}}
+
+    monkeypatch.setattr(assistant.speech, "transcribe", AsyncMock(return_value="Any flights?"))
+    monkeypatch.setattr(voice_personal_assistant, "run_voice_agent", fake_agent)
+    monkeypatch.setattr(
+        assistant,
+        "_execute_intent",
+        AsyncMock(return_value={"response_text": "None.", "calendar_events": [], "notifications": [], "errors": []}),
+    )
+    monkeypatch.setattr(assistant.speech, "synthesize", AsyncMock(return_value=None))
+
+    stream = assistant.stream_audio("sample.wav")
+    await stream.__anext__()
+    early = await stream.__anext__()
+    assert early.intent == "calendar_lookup"
+    assert early.response_text == ""
+
+    release.set()
+    rest = [result async for result in stream]
+    assert rest[-1].response_text == "None."
+
+
+@pytest.mark.asyncio
+async def test_synthesize_sentences_preserves_order(monkeypatch):
+    assistant = VoicePersonalAssistant(user_id=1)
+
+    async def fake_synthesize(text):
+        # Later sentences finish first; output must still follow reading order.
+        await asyncio.sleep(0.01 if text.startswith("First") else 0)
+        return f"{text[:5]}.mp3"
+
+    monkeypatch.setattr(assistant.speech, "synthesize", fake_synthesize)
+
+    paths = [path async for path in assistant.speech.synthesize_sentences("First one. Second one! Third?")]
+
+    assert paths == ["First.mp3", "Secon.mp3", "Third.mp3"]
+
+
+@pytest.mark.asyncio
+async def test_stream_audio_speaks_canned_follow_up(monkeypatch):
+    assistant = VoicePersonalAssistant(user_id=1)
+    monkeypatch.setattr(assistant.speech, "transcribe", AsyncMock(return_value="Hello"))
+    monkeypatch.setattr(
+        voice_personal_assistant,
+        "run_voice_agent",
+        AsyncMock(return_value={"intent": "unknown", "confidence": 0.0, "follow_up_key": "parse_error"}),
+    )
+    monkeypatch.setattr(assistant, "_persist_conversation", lambda **kwargs: None)
+
+    result = await assistant.handle_audio("dummy.wav")
+
+    assert result.response_text == voice_personal_assistant.CANNED_PROMPTS["parse_error"]
+
+
+@pytest.mark.asyncio
+async def test_stream_audio_replays_semantic_cache_hit(monkeypatch):
+    assistant = VoicePersonalAssistant(user_id=3)
+    cache = SemanticCache(client=object())
+    monkeypatch.setattr(cache, "embed", AsyncMock(return_value=np.array([1.0, 0.0], dtype=np.float32)))
+    cache.store(3, np.array([1.0, 0.0], dtype=np.float32), {"response_text": "Cached.", "intent": "smalltalk"})
+    assistant.semantic_cache = cache
+
+    monkeypatch.setattr(assistant.speech, "transcribe", AsyncMock(return_value="Hi"))
+    monkeypatch.setattr(
+        voice_personal_assistant,
+        "run_voice_agent",
+        AsyncMock(return_value={"intent": "unknown", "confidence": 0.0}),
+    )
+    execute = AsyncMock()
+    monkeypatch.setattr(assistant, "_execute_intent", execute)
+    monkeypatch.setattr(assistant, "_persist_conversation", lambda **kwargs: None)
+
+    result = await assistant.handle_audio("dummy.wav")
+
+    assert result.response_text == "Cached."
+    assert result.intent == "smalltalk"
+    execute.assert_not_awaited()
+    # Entries are partitioned per user.
+    assert cache.lookup(4, np.array([1.0, 0.0], dtype=np.float32)) is None
 
 
 def test_format_datetime():
     assistant = VoicePersonalAssistant(user_id=1)
     formatted = assistant._format_datetime("2024-10-19T18:00:00Z")
     assert "Oct" in formatted
+
+
+def test_format_datetime_matches_strftime_layout():
+    assistant = VoicePersonalAssistant(user_id=1)
+    assert assistant._format_datetime("2024-10-19T18:00:00Z") == "Oct 19 at 06:00 PM"
+    assert assistant._format_datetime("2024-01-05T00:30:00-07:00") == "Jan 05 at 12:30 AM"
+    assert assistant._format_datetime("2024-10-19") == "Oct 19 at 12:00 AM"
+    assert assistant._format_datetime("not a date") == "not a date"
+
+
+def test_normalize_transcription_drops_fillers_only():
+    normalize = voice_personal_assistant._normalize_transcription
+    assert normalize("Um, what's on my   calendar, uh, tomorrow?") == "what's on my calendar, tomorrow?"
+    assert normalize("I'd like to email Dana") == "I'd like to email Dana"
+
+
+def test_parse_batch_payload_tolerates_loose_ids():
+    parse = run_voice_agent._parse_batch_payload
+    assert parse('{"results": [{"id": "0", "intent": "smalltalk"}]}', 1)[0]["intent"] == "smalltalk"
+    assert parse('{"intent": "calendar_lookup", "confidence": 0.9}', 1)[0]["intent"] == "calendar_lookup"
+    batch = parse('{"results": [{"id": "1", "intent": "smalltalk"}, {"id": 0, "intent": "unknown"}]}', 2)
+    assert [item["intent"] for item in batch] == ["unknown", "smalltalk"]
+    assert "id" not in batch[0]
@@ -1,27 +1,93 @@
 import asyncio
 import base64
+import hashlib
 import inspect
 import logging
 import os
-from dataclasses import dataclass, field
+import re
+import sys
+import uuid
+from dataclasses import dataclass, field, replace
 from datetime import datetime
+from functools import lru_cache, partial
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from typing import Any, AsyncIterator, Awaitable, Callable, Coroutine, Dict, List, Optional, Set, Tuple
 
-from database import CalendarEvent, Conversation, DatabaseManager, init_database
-from notification_services import PushoverClient, SendGridClient
-from calendar_service import GoogleCalendarClient
-from run_voice_agent import run_voice_agent
+import httpx
+
+from database import DatabaseManager, insert_conversations, upsert_calendar_events
+from notification_services import get_pushover_client, get_sendgrid_client
+from calendar_service import get_calendar_client
+from run_voice_agent import FOLLOW_UP_PROMPTS, run_voice_agent
+from semantic_cache import CACHEABLE_INTENTS, get_semantic_cache
+from speech_kernels import wav_rms_energy
+
+try:
+    from openai import AsyncOpenAI
+except ImportError:  # pragma: no cover - optional dependency
+    AsyncOpenAI = None
 
 try:
-    from openai import OpenAI
+    import ciso8601
 except ImportError:  # pragma: no cover - optional dependency
-    OpenAI = None
+    ciso8601 = None
 
 logger = logging.getLogger(__name__)
 
-# Ensure tables exist when module is imported.
-init_database()
+TTS_MAX_PARALLEL_REQUESTS = 3
+# Process-wide cap on in-flight speech requests; per-turn TTS fan-out is bounded separately above.
+_SPEECH_SEMAPHORE = asyncio.Semaphore(int(os.getenv("OPENAI_SPEECH_MAX_CONCURRENCY", "32")))
+TTS_STREAM_CHUNK_BYTES = 8192
+TTS_DISK_CACHE_MAX_FILES = int(os.getenv("TTS_DISK_CACHE_MAX_FILES", "500"))
+SPEECH_TIMEOUT_SECONDS = float(os.getenv("SPEECH_TIMEOUT_SECONDS", "60"))
+# Shared by every session through get_speech_service(), so sized for many concurrent turns.
+SPEECH_HTTP_LIMITS = httpx.Limits(max_keepalive_connections=50, max_connections=100)
+# Recordings quieter than this (normalized RMS) are treated as silence and not sent to Whisper.
+SILENCE_RMS_THRESHOLD = float(os.getenv("SILENCE_RMS_THRESHOLD", "0.001"))
+# Conversation rows are queued and written in batches off the request path.
+CONVERSATION_QUEUE_MAXSIZE = 10_000
+CONVERSATION_BATCH_SIZE = 100
+CONVERSATION_BATCH_WAIT_SECONDS = 0.05
+
+_SENTENCE_SPLIT = re.compile(r"(?<=[.!?])\s+")
+# Whisper transcribes hesitations verbatim; they only add noise to intent routing and cache keys.
+_FILLER_WORDS = re.compile(r"\b(?:u+m+|u+h+|erm|hm+|mm+)\b[,.]?\s*", re.IGNORECASE)
+_WHITESPACE = re.compile(r"\s+")
+# Calendar dateTimes look like 2024-10-19T18:00:00Z; only the wall-clock fields are displayed.
+_ISO_DATETIME = re.compile(r"(\d{4})-(\d{2})-(\d{2})T(\d{2}):(\d{2})")
+_MONTHS = ("Jan", "Feb", "Mar", "Apr", "May", "Jun", "Jul", "Aug", "Sep", "Oct", "Nov", "Dec")
+
+# ISO 8601 parser: the ciso8601 C extension when installed, else the stdlib (which reads "Z" from 3.11).
+if ciso8601 is not None:
+    _parse_iso = ciso8601.parse_datetime
+elif sys.version_info >= (3, 11):
+    _parse_iso = datetime.fromisoformat
+else:  # pragma: no cover - older interpreters
+
+    def _parse_iso(value: str) -> datetime:
+        return datetime.fromisoformat(value[:-1] + "+00:00" if value.endswith("Z") else value)
+
+
+# Fixed replies whose audio is rendered once into TTS_CACHE_DIR instead of on every turn.
+CANNED_PROMPTS: Dict[str, str] = {
+    "transcription_failed": "I could not transcribe your audio. Please try again.",
+    "calendar_no_match": "I could not find any matching events in your calendar.",
+    "calendar_empty": "I didn't find any upcoming events that match your request.",
+    "push_missing_message": "What would you like me to include in the push notification?",
+    "push_sent": "I sent your push notification.",
+    "push_failed": "I could not send the push notification.",
+    "email_missing_recipient": "Who should I email? Please provide an email address.",
+    "email_missing_body": "What would you like me to say in the email?",
+    "email_sent": "I sent the email as requested.",
+    "email_failed": "I could not send the email.",
+    "smalltalk": "Happy to help! What else can I do for you?",
+    "clarification": "Could you clarify what you need?",
+    "unknown": "I'm not sure how to help with that yet, but I'm learning every day!",
+    **FOLLOW_UP_PROMPTS,
+}
+TTS_CACHE_DIR = Path("output/tts_cache")
+# (model, voice, sentence) -> pre-rendered audio path, filled by prebuild_tts_cache().
+_canned_audio: Dict[Tuple[str, str, str], str] = {}
 
 
 @dataclass
@@ -34,6 +100,37 @@ class VoiceInteractionResult:
     calendar_events: List[Dict[str, Any]] = field(default_factory=list)
     notifications: List[Dict[str, Any]] = field(default_factory=list)
     errors: List[str] = field(default_factory=list)
+    audio_segments: List[str] = field(default_factory=list)
+
+
+def _debug_traceback() -> bool:
+    """exc_info for per-turn failures: tracebacks are only formatted when DEBUG is on."""
+    return logger.isEnabledFor(logging.DEBUG)
+
+
+@lru_cache(maxsize=512)
+def _format_datetime(value: Optional[str]) -> str:
+    if not value:
+        return "an unspecified time"
+    match = _ISO_DATETIME.match(value)
+    if match:
+        _, month, day, hour, minute = match.groups()
+        month_index, hour_value = int(month) - 1, int(hour)
+        if 0 <= month_index < 12 and hour_value < 24:
+            meridiem = "AM" if hour_value < 12 else "PM"
+            return f"{_MONTHS[month_index]} {day} at {hour_value % 12 or 12:02d}:{minute} {meridiem}"
+    try:
+        return _parse_iso(value).strftime("%b %d at %I:%M %p")
+    except ValueError:
+        return value
+
+
+def _normalize_transcription(text: str) -> str:
+    return _WHITESPACE.sub(" ", _FILLER_WORDS.sub("", text)).strip()
+
+
+def _chunk_by_sentence(text: str) -> List[str]:
+    return [sentence for sentence in _SENTENCE_SPLIT.split(text.strip()) if sentence]
 
 
 class SpeechService:
@@ -46,12 +143,40 @@ class SpeechService:
         tts_voice: str = "alloy",
     ) -> None:
         self.api_key = os.getenv("OPENAI_API_KEY")
-        self.client = OpenAI(api_key=self.api_key) if self.api_key and OpenAI else None
+        self.client = (
+            AsyncOpenAI(
+                api_key=self.api_key,
+                http_client=httpx.AsyncClient(
+                    http2=True, timeout=SPEECH_TIMEOUT_SECONDS, limits=SPEECH_HTTP_LIMITS
+                ),
+            )
+            if self.api_key and AsyncOpenAI
+            else None
+        )
         self.stt_model = stt_model
         self.tts_model = tts_model
         self.tts_voice = tts_voice
         self.output_dir = Path("output/audio")
         self.output_dir.mkdir(parents=True, exist_ok=True)
+        # Cached clips on disk, counted in-process; None until the directory is first scanned.
+        self._disk_cache_files: Optional[int] = None
+
+        # The SDK surface never changes at runtime, so the streaming call is resolved once.
+        self._tts_call: Optional[Callable[..., Any]] = self._probe_tts_stream()
+
+    def _probe_tts_stream(self) -> Optional[Callable[..., Any]]:
+        """Bind the streaming TTS endpoint to the arguments this SDK accepts, or None without one."""
+        speech_api = self.client.audio.speech if self.client else None
+        stream_fn = getattr(getattr(speech_api, "with_streaming_response", None), "create", None)
+        if stream_fn is None:
+            return None
+        try:
+            params = inspect.signature(stream_fn).parameters
+        except (TypeError, ValueError):
+            params = {}
+        format_key = next((key for key in ("format", "audio_format") if key in params), None)
+        format_args = {format_key: "mp3"} if format_key else {}
+        return partial(stream_fn, model=self.tts_model, voice=self.tts_voice, **format_args)
 
     def is_configured(self) -> bool:
         return self.client is not None
@@ -62,88 +187,246 @@ class SpeechService:
         if not os.path.exists(audio_path):
             raise FileNotFoundError(f"Audio file {audio_path} not found.")
 
-        def _transcribe() -> str:
-            with open(audio_path, "rb") as audio_file:
-                result = self.client.audio.transcriptions.create(
+        energy = await asyncio.to_thread(wav_rms_energy, audio_path)
+        if energy is not None and energy < SILENCE_RMS_THRESHOLD:
+            logger.info("Skipping transcription of silent recording (rms=%.5f)", energy)
+            return ""
+
+        # httpx streams the open handle in chunks; the recording is never held as one bytes object.
+        with open(audio_path, "rb") as audio_file:
+            async with _SPEECH_SEMAPHORE:
+                return await self.client.audio.transcriptions.create(
                     model=self.stt_model,
-                    file=audio_file,
+                    file=(os.path.basename(audio_path), audio_file),
                     response_format="text",
                 )
-            return result
-
-        return await asyncio.to_thread(_transcribe)
 
     async def synthesize(self, text: str) -> Optional[str]:
         if not self.is_configured():
             return None
         if not text.strip():
             return None
+        canned = _canned_audio.get((self.tts_model, self.tts_voice, text))
+        if canned is not None:
+            return canned
 
-        timestamp = datetime.utcnow().strftime("%Y%m%d%H%M%S%f")
-        output_path = self.output_dir / f"assistant_{timestamp}.mp3"
+        # Identical replies are content-addressed on disk and never synthesized twice.
+        digest = hashlib.sha256(f"{self.tts_model}|{self.tts_voice}|{text}".encode("utf-8")).hexdigest()
+        cache_path = self.output_dir / f"cache_{digest}.mp3"
+        try:
+            # Touch on hit so eviction drops the least recently used clips first.
+            os.utime(cache_path)
+            return str(cache_path)
+        except FileNotFoundError:
+            pass
 
-        def _synthesize() -> str:
-            request_args: Dict[str, Any] = {
-                "model": self.tts_model,
-                "voice": self.tts_voice,
-                "input": text,
-            }
+        output_path = self.output_dir / f"assistant_{uuid.uuid4().hex}.mp3"
 
-            try:
-                create_fn = self.client.audio.speech.with_streaming_response.create
-                supported_params = set(inspect.signature(create_fn).parameters)
-            except (AttributeError, TypeError, ValueError):
-                create_fn = None
-                supported_params = set()
-
-            if "format" in supported_params:
-                request_args["format"] = "mp3"
-            elif "audio_format" in supported_params:
-                request_args["audio_format"] = "mp3"
-
-            # Try streaming first (when supported and stable).
-            if create_fn is not None:
+        try:
+            if self._tts_call is not None:
                 try:
-                    ctx = create_fn(**request_args)
+                    async for _ in self.stream(text, output_path):
+                        pass
                 except TypeError as exc:
-                    # Retry without format arguments if they are unsupported.
-                    request_args.pop("format", None)
-                    request_args.pop("audio_format", None)
-                    try:
-                        ctx = create_fn(**request_args)
-                    except TypeError:
-                        logger.warning("Streaming TTS unsupported, falling back to non-streaming: %s", exc)
-                        ctx = None
-                if ctx is not None:
-                    with ctx as response:
-                        response.stream_to_file(output_path)
-                    return str(output_path)
-
-            # Fallback: non-streaming API (works on older SDKs).
-            non_stream_args = {k: v for k, v in request_args.items() if k in {"model", "voice", "input"}}
-            response = self.client.audio.speech.create(**non_stream_args)
-            audio_payload = getattr(response, "audio", None)
-            if not audio_payload and hasattr(response, "data"):
-                first = response.data[0] if response.data else None
-                audio_payload = getattr(first, "audio", None) if first else None
-            if not audio_payload and isinstance(response, dict):
-                audio_payload = response.get("audio")
-
-            if isinstance(audio_payload, bytes):
-                audio_bytes = audio_payload
-            else:
-                audio_bytes = base64.b64decode(audio_payload) if audio_payload else b""
+                    # The SDK rejected the bound arguments; stop trying to stream for this process.
+                    logger.warning("Streaming TTS unsupported, falling back to non-streaming: %s", exc)
+                    self._tts_call = None
+            if self._tts_call is None:
+                await self._synthesize_buffered(text, output_path)
+            # An empty clip would be cached and replayed as silence for this text from then on.
+            if output_path.stat().st_size == 0:
+                raise ValueError("speech API returned no audio")
+            # Publish atomically so a concurrent hit never reads a partial file.
+            os.replace(output_path, cache_path)
+        except Exception as exc:  # pragma: no cover - best effort
+            logger.error("Failed to synthesize speech: %s", exc, exc_info=_debug_traceback())
+            output_path.unlink(missing_ok=True)
+            return None
+
+        if self._disk_cache_files is not None:
+            self._disk_cache_files += 1
+        # The directory is only scanned when the count says it may be over the limit.
+        if self._disk_cache_files is None or self._disk_cache_files > TTS_DISK_CACHE_MAX_FILES:
+            self._disk_cache_files = await asyncio.to_thread(self._evict_disk_cache)
+        return str(cache_path)
+
+    def _evict_disk_cache(self) -> int:
+        """Trim the cache to the most recently used clips once it exceeds TTS_DISK_CACHE_MAX_FILES.
 
+        Trims to 90% of the limit so a full cache is not rescanned on every miss; returns how many remain.
+        """
+        entries = []
+        for path in self.output_dir.glob("cache_*.mp3"):
+            try:
+                entries.append((path.stat().st_mtime, path))
+            except FileNotFoundError:
+                continue
+        if len(entries) <= TTS_DISK_CACHE_MAX_FILES:
+            return len(entries)
+        keep = TTS_DISK_CACHE_MAX_FILES * 9 // 10
+        entries.sort(reverse=True)
+        for _, path in entries[keep:]:
+            path.unlink(missing_ok=True)
+        return keep
+
+    async def stream(self, text: str, output_path: Path) -> AsyncIterator[bytes]:
+        """Yield synthesized audio as it arrives from the API, teeing every chunk into ``output_path``."""
+        async with _SPEECH_SEMAPHORE, self._tts_call(input=text) as response:
             with open(output_path, "wb") as audio_file:
-                audio_file.write(audio_bytes)
+                async for chunk in response.iter_bytes(TTS_STREAM_CHUNK_BYTES):
+                    audio_file.write(chunk)
+                    yield chunk
+
+    async def _synthesize_buffered(self, text: str, output_path: Path) -> str:
+        # Fallback: non-streaming API (works on older SDKs).
+        async with _SPEECH_SEMAPHORE:
+            response = await self.client.audio.speech.create(
+                model=self.tts_model, voice=self.tts_voice, input=text
+            )
+        # AsyncOpenAI returns the raw MP3 body; older SDKs wrapped base64 audio in the response.
+        audio_payload = getattr(response, "content", None)
+        if not isinstance(audio_payload, bytes):
+            audio_payload = getattr(response, "audio", None)
+        if not audio_payload and hasattr(response, "data"):
+            first = response.data[0] if response.data else None
+            audio_payload = getattr(first, "audio", None) if first else None
+        if not audio_payload and isinstance(response, dict):
+            audio_payload = response.get("audio")
+
+        if isinstance(audio_payload, bytes):
+            audio_bytes = audio_payload
+        else:
+            audio_bytes = base64.b64decode(audio_payload) if audio_payload else b""
+
+        with open(output_path, "wb") as audio_file:
+            audio_file.write(audio_bytes)
+
+        return str(output_path)
 
+    async def synthesize_sentences(self, text: str) -> AsyncIterator[Optional[str]]:
+        """Synthesize each sentence concurrently and yield the audio paths in reading order."""
+        semaphore = asyncio.Semaphore(TTS_MAX_PARALLEL_REQUESTS)
+
+        async def _synthesize_one(sentence: str) -> Optional[str]:
+            async with semaphore:
+                return await self.synthesize(sentence)
+
+        tasks = [asyncio.create_task(_synthesize_one(sentence)) for sentence in _chunk_by_sentence(text)]
+        try:
+            for task in tasks:
+                yield await task
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    async def combine_segments(self, segments: List[str]) -> Optional[str]:
+        """Join per-sentence MP3 segments into one file (MP3 frames concatenate cleanly)."""
+        if len(segments) <= 1:
+            return segments[0] if segments else None
+
+        output_path = self.output_dir / f"assistant_{uuid.uuid4().hex}.mp3"
+
+        def _combine() -> str:
+            with open(output_path, "wb") as combined:
+                for segment in segments:
+                    with open(segment, "rb") as part:
+                        combined.write(part.read())
             return str(output_path)
 
+        return await asyncio.to_thread(_combine)
+
+    async def prebuild_canned_audio(self) -> None:
+        """Render every CANNED_PROMPTS sentence once; files already on disk are reused."""
+        if not self.is_configured():
+            return
+        TTS_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        for prompt in CANNED_PROMPTS.values():
+            # Replies are synthesized sentence by sentence, so that is the cache granularity.
+            for sentence in _chunk_by_sentence(prompt):
+                key = (self.tts_model, self.tts_voice, sentence)
+                if key in _canned_audio:
+                    continue
+                digest = hashlib.sha1("|".join(key).encode("utf-8")).hexdigest()
+                cache_path = TTS_CACHE_DIR / f"{digest}.mp3"
+                if not cache_path.exists():
+                    rendered = await self.synthesize(sentence)
+                    if not rendered:
+                        continue
+                    os.replace(rendered, cache_path)
+                _canned_audio[key] = str(cache_path)
+
+
+@lru_cache(maxsize=1)
+def get_speech_service() -> SpeechService:
+    """Process-wide speech service; its OpenAI client keeps one warm connection pool."""
+    return SpeechService()
+
+
+_tts_cache_built = False
+
+
+async def prebuild_tts_cache() -> None:
+    """Pre-render the canned prompt audio once per process."""
+    global _tts_cache_built
+    if _tts_cache_built:
+        return
+    _tts_cache_built = True
+    try:
+        await get_speech_service().prebuild_canned_audio()
+    except Exception:  # pragma: no cover - best effort
+        logger.warning("TTS cache prebuild failed", exc_info=True)
+
+
+class _ConversationWriter:
+    """Single background task that drains queued conversation rows into batched inserts."""
+
+    def __init__(self) -> None:
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+
+    def submit(self, row: Dict[str, Any]) -> None:
+        # There is no startup hook to attach to, so the writer starts on the first row of each loop.
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            self._loop = loop
+            self._queue = asyncio.Queue(maxsize=CONVERSATION_QUEUE_MAXSIZE)
+            self._task = loop.create_task(self._run(self._queue))
         try:
-            return await asyncio.to_thread(_synthesize)
-        except Exception as exc:  # pragma: no cover - best effort
-            logger.error("Failed to synthesize speech: %s", exc, exc_info=True)
-            return None
+            self._queue.put_nowait(row)
+        except asyncio.QueueFull:
+            # The database has fallen far behind; write this row on its own rather than drop it.
+            logger.warning("Conversation queue is full; writing row directly")
+            task = loop.create_task(asyncio.to_thread(self._write, [row]))
+            task.add_done_callback(self._on_write_done)
+
+    async def _run(self, queue: asyncio.Queue) -> None:
+        while True:
+            batch = [await queue.get()]
+            await asyncio.sleep(CONVERSATION_BATCH_WAIT_SECONDS)
+            while len(batch) < CONVERSATION_BATCH_SIZE and not queue.empty():
+                batch.append(queue.get_nowait())
+            try:
+                await asyncio.to_thread(self._write, batch)
+            except Exception as exc:
+                logger.error(
+                    "Failed to persist %d conversation(s): %s", len(batch), exc, exc_info=_debug_traceback()
+                )
+
+    @staticmethod
+    def _write(rows: List[Dict[str, Any]]) -> None:
+        with DatabaseManager().get_session() as session:
+            insert_conversations(session, rows)
+
+    @staticmethod
+    def _on_write_done(task: asyncio.Task) -> None:
+        if not task.cancelled() and task.exception() is not None:
+            logger.error("Failed to persist conversation", exc_info=task.exception())
+
+
+@lru_cache(maxsize=1)
+def get_conversation_writer() -> _ConversationWriter:
+    return _ConversationWriter()
 
 
 class VoicePersonalAssistant:
@@ -152,59 +435,149 @@ class VoicePersonalAssistant:
     def __init__(self, user_id: int) -> None:
         self.user_id = user_id
         self.db = DatabaseManager()
-        self.speech = SpeechService()
-        self.calendar_client = GoogleCalendarClient()
-        self.pushover_client = PushoverClient()
-        self.sendgrid_client = SendGridClient()
+        # Service clients are process-wide so their connection pools outlive any one user.
+        self.speech = get_speech_service()
+        self.calendar_client = get_calendar_client()
+        self.pushover_client = get_pushover_client()
+        self.sendgrid_client = get_sendgrid_client()
+        self.semantic_cache = get_semantic_cache()
+        # asyncio keeps only weak references to tasks; hold background work until it finishes.
+        self._pending_tasks: Set[asyncio.Task] = set()
 
     async def handle_audio(self, audio_path: str) -> VoiceInteractionResult:
+        result: Optional[VoiceInteractionResult] = None
+        async for result in self.stream_audio(audio_path):
+            pass
+        return result
+
+    async def stream_audio(self, audio_path: str) -> AsyncIterator[VoiceInteractionResult]:
+        """Yield a progressively filled result after transcription, intent execution and TTS."""
         errors: List[str] = []
         try:
             transcription = await self.speech.transcribe(audio_path)
         except Exception as exc:
-            logger.exception("Transcription failed")
+            logger.error("Transcription failed: %s", exc, exc_info=_debug_traceback())
             transcription = ""
             errors.append(f"Transcription failed: {exc}")
 
-        if not transcription:
-            transcription = "I could not transcribe your audio. Please try again."
+        heard = bool(transcription)
+        if not heard:
+            transcription = CANNED_PROMPTS["transcription_failed"]
         else:
             logger.info("Transcription result: %s", transcription)
 
-        agent_result = await run_voice_agent(transcription, user_id=str(self.user_id))
-        intent = agent_result.get("intent", "unknown")
-        confidence = float(agent_result.get("confidence", 0.0))
-        parameters = agent_result.get("parameters", {}) or {}
-        follow_up = agent_result.get("follow_up")
+        result = VoiceInteractionResult(
+            transcription=transcription,
+            response_text="",
+            audio_path=None,
+            intent="",
+            confidence=0.0,
+            errors=list(errors),
+        )
+        yield result
 
-        execution = await self._execute_intent(intent, parameters, follow_up)
-        errors.extend(execution.get("errors", []))
+        # Routing sees the cleaned text; the transcript shown and stored stays verbatim.
+        query = (_normalize_transcription(transcription) or transcription) if heard else transcription
+
+        # The agent streams its reply; surface the intent as soon as it is known.
+        early_intents: List[str] = []
+        intent_known = asyncio.Event()
 
-        response_text = execution.get("response_text") or agent_result.get(
-            "summary", "I processed your request."
+        def _on_intent(intent: str) -> None:
+            early_intents.append(intent)
+            intent_known.set()
+
+        agent_task = asyncio.create_task(
+            run_voice_agent(query, user_id=str(self.user_id), on_intent=_on_intent)
         )
-        calendar_events = execution.get("calendar_events", [])
-        notifications = execution.get("notifications", [])
+        intent_waiter = asyncio.create_task(intent_known.wait())
+        embedding = None
+        cached_turn: Optional[Dict[str, Any]] = None
+        try:
+            if heard and self.semantic_cache.is_configured():
+                # The embedding usually returns well before the agent; a hit cancels the agent call.
+                embedding = await self.semantic_cache.embed(query)
+                cached_turn = self.semantic_cache.lookup(self.user_id, embedding)
+            if cached_turn is None:
+                await asyncio.wait({agent_task, intent_waiter}, return_when=asyncio.FIRST_COMPLETED)
+                if early_intents and not agent_task.done():
+                    yield replace(result, intent=early_intents[0])
+                agent_result = await agent_task
+        finally:
+            intent_waiter.cancel()
+            agent_task.cancel()
+
+        if cached_turn is not None:
+            result = replace(result, **cached_turn)
+        else:
+            result = await self._run_intent(result, agent_result, errors, embedding)
+        yield result
 
-        audio_output = await self.speech.synthesize(response_text)
+        # The event sync never affects the reply, so it is not awaited at all.
+        if result.calendar_events:
+            self._spawn(asyncio.to_thread(self._sync_calendar_events, result.calendar_events))
 
         self._persist_conversation(
             transcription=transcription,
-            response=response_text,
-            intent=intent,
-            confidence=confidence,
+            response=result.response_text,
+            intent=result.intent,
+            confidence=result.confidence,
         )
+        # Sentences are synthesized in parallel; each segment is surfaced as soon as it is ready.
+        segments: List[str] = []
+        async for segment in self.speech.synthesize_sentences(result.response_text):
+            if segment:
+                segments.append(segment)
+                yield replace(result, audio_segments=list(segments))
+        audio_output = await self.speech.combine_segments(segments)
+
+        yield replace(result, audio_path=audio_output, audio_segments=segments)
+
+    def _spawn(self, coro: Coroutine[Any, Any, Any]) -> None:
+        """Run ``coro`` in the background; failures are logged rather than lost."""
+        task = asyncio.create_task(coro)
+        self._pending_tasks.add(task)
+        task.add_done_callback(self._on_background_done)
+
+    def _on_background_done(self, task: asyncio.Task) -> None:
+        self._pending_tasks.discard(task)
+        if not task.cancelled() and task.exception() is not None:
+            logger.error("Background task failed", exc_info=task.exception())
+
+    async def _run_intent(
+        self,
+        result: VoiceInteractionResult,
+        agent_result: Dict[str, Any],
+        errors: List[str],
+        embedding: Any,
+    ) -> VoiceInteractionResult:
+        intent = agent_result.get("intent", "unknown")
+        confidence = float(agent_result.get("confidence", 0.0))
+        parameters = agent_result.get("parameters", {}) or {}
+        follow_up = agent_result.get("follow_up")
 
-        return VoiceInteractionResult(
-            transcription=transcription,
-            response_text=response_text,
-            audio_path=audio_output,
-            intent=intent,
-            confidence=confidence,
-            calendar_events=calendar_events,
-            notifications=notifications,
-            errors=errors,
-        )
+        execution = await self._execute_intent(intent, parameters, follow_up)
+        execution_errors = execution.get("errors", [])
+        errors.extend(execution_errors)
+
+        follow_up_key = agent_result.get("follow_up_key")
+        if follow_up_key in CANNED_PROMPTS:
+            # The agent reply was unusable; speak its fixed follow-up, which has pre-rendered audio.
+            response_text = CANNED_PROMPTS[follow_up_key]
+        else:
+            response_text = execution.get("response_text") or agent_result.get(
+                "summary", "I processed your request."
+            )
+        turn = {
+            "response_text": response_text,
+            "intent": intent,
+            "confidence": confidence,
+            "calendar_events": execution.get("calendar_events", []),
+            "notifications": execution.get("notifications", []),
+        }
+        if intent in CACHEABLE_INTENTS and not execution_errors and follow_up_key is None:
+            self.semantic_cache.store(self.user_id, embedding, turn)
+        return replace(result, errors=list(errors), **turn)
 
     async def _execute_intent(
         self,
@@ -212,16 +585,8 @@ class VoicePersonalAssistant:
         parameters: Dict[str, Any],
         follow_up: Optional[str],
     ) -> Dict[str, Any]:
-        intent = intent or "unknown"
-        handlers = {
-            "calendar_lookup": self._handle_calendar_lookup,
-            "push_notification": self._handle_push_notification,
-            "send_email": self._handle_send_email,
-            "smalltalk": self._handle_smalltalk,
-            "clarification": self._handle_clarification,
-        }
-        handler = handlers.get(intent, self._handle_unknown)
-        return await handler(parameters, follow_up)
+        handler = self._HANDLERS.get(intent or "unknown", VoicePersonalAssistant._handle_unknown)
+        return await handler(self, parameters, follow_up)
 
     async def _handle_calendar_lookup(
         self, parameters: Dict[str, Any], follow_up: Optional[str]
@@ -241,17 +606,20 @@ class VoicePersonalAssistant:
             )
         else:
             try:
-                events = self.calendar_client.list_upcoming_events(
-                    query=keyword, within_days=int(within_days), max_results=int(max_results)
+                events = await asyncio.to_thread(
+                    self.calendar_client.list_upcoming_events,
+                    query=keyword,
+                    within_days=int(within_days),
+                    max_results=int(max_results),
                 )
-                response_text = self._format_calendar_response(events, keyword)
-                self._sync_calendar_events(events)
             except Exception as exc:  # pragma: no cover
-                logger.exception("Calendar lookup failed")
+                logger.error("Calendar lookup failed: %s", exc, exc_info=_debug_traceback())
                 errors.append(f"Calendar lookup failed: {exc}")
+            else:
+                response_text = self._format_calendar_response(events, keyword)
 
         if not response_text and not errors:
-            response_text = "I could not find any matching events in your calendar."
+            response_text = CANNED_PROMPTS["calendar_no_match"]
 
         return {
             "response_text": response_text,
@@ -271,7 +639,7 @@ class VoicePersonalAssistant:
 
         if not message:
             return {
-                "response_text": "What would you like me to include in the push notification?",
+                "response_text": CANNED_PROMPTS["push_missing_message"],
                 "calendar_events": [],
                 "notifications": [],
                 "errors": [],
@@ -286,12 +654,10 @@ class VoicePersonalAssistant:
                 )
                 notifications.append({"channel": "pushover", "result": result})
             except Exception as exc:  # pragma: no cover
-                logger.exception("Pushover notification failed")
+                logger.error("Pushover notification failed: %s", exc, exc_info=_debug_traceback())
                 errors.append(f"Pushover notification failed: {exc}")
 
-        response_text = (
-            "I sent your push notification." if not errors else "I could not send the push notification."
-        )
+        response_text = CANNED_PROMPTS["push_sent"] if not errors else CANNED_PROMPTS["push_failed"]
         return {
             "response_text": response_text,
             "calendar_events": [],
@@ -310,7 +676,7 @@ class VoicePersonalAssistant:
 
         if not to_email:
             return {
-                "response_text": "Who should I email? Please provide an email address.",
+                "response_text": CANNED_PROMPTS["email_missing_recipient"],
                 "calendar_events": [],
                 "notifications": [],
                 "errors": [],
@@ -318,7 +684,7 @@ class VoicePersonalAssistant:
 
         if not body:
             return {
-                "response_text": "What would you like me to say in the email?",
+                "response_text": CANNED_PROMPTS["email_missing_body"],
                 "calendar_events": [],
                 "notifications": [],
                 "errors": [],
@@ -335,12 +701,10 @@ class VoicePersonalAssistant:
                 )
                 notifications.append({"channel": "sendgrid", "result": result})
             except Exception as exc:  # pragma: no cover
-                logger.exception("SendGrid email failed")
+                logger.error("SendGrid email failed: %s", exc, exc_info=_debug_traceback())
                 errors.append(f"SendGrid email failed: {exc}")
 
-        response_text = (
-            "I sent the email as requested." if not errors else "I could not send the email."
-        )
+        response_text = CANNED_PROMPTS["email_sent"] if not errors else CANNED_PROMPTS["email_failed"]
         return {
             "response_text": response_text,
             "calendar_events": [],
@@ -351,7 +715,7 @@ class VoicePersonalAssistant:
     async def _handle_smalltalk(
         self, parameters: Dict[str, Any], follow_up: Optional[str]
     ) -> Dict[str, Any]:
-        response_text = parameters.get("reply") or "Happy to help! What else can I do for you?"
+        response_text = parameters.get("reply") or CANNED_PROMPTS["smalltalk"]
         return {
             "response_text": response_text,
             "calendar_events": [],
@@ -362,7 +726,7 @@ class VoicePersonalAssistant:
     async def _handle_clarification(
         self, parameters: Dict[str, Any], follow_up: Optional[str]
     ) -> Dict[str, Any]:
-        question = follow_up or parameters.get("question") or "Could you clarify what you need?"
+        question = follow_up or parameters.get("question") or CANNED_PROMPTS["clarification"]
         return {
             "response_text": question,
             "calendar_events": [],
@@ -374,26 +738,37 @@ class VoicePersonalAssistant:
         self, parameters: Dict[str, Any], follow_up: Optional[str]
     ) -> Dict[str, Any]:
         return {
-            "response_text": "I'm not sure how to help with that yet, but I'm learning every day!",
+            "response_text": CANNED_PROMPTS["unknown"],
             "calendar_events": [],
             "notifications": [],
             "errors": [],
         }
 
+    # Built once with plain functions; _execute_intent passes self explicitly.
+    _HANDLERS: Dict[str, Callable[..., Awaitable[Dict[str, Any]]]] = {
+        "calendar_lookup": _handle_calendar_lookup,
+        "push_notification": _handle_push_notification,
+        "send_email": _handle_send_email,
+        "smalltalk": _handle_smalltalk,
+        "clarification": _handle_clarification,
+    }
+
     def _format_calendar_response(self, events: List[Dict[str, Any]], keyword: Optional[str]) -> str:
         if not events:
-            return "I didn't find any upcoming events that match your request."
+            return CANNED_PROMPTS["calendar_empty"]
 
         keyword_text = f" related to {keyword}" if keyword else ""
         lines = [f"Here are your next {len(events)} events{keyword_text}:"]
 
         for event in events:
-            start = event.get("start", {}).get("dateTime") or event.get("start", {}).get("date")
-            end = event.get("end", {}).get("dateTime") or event.get("end", {}).get("date")
+            start_obj = event.get("start") or {}
+            end_obj = event.get("end") or {}
+            start = start_obj.get("dateTime") or start_obj.get("date")
+            end = end_obj.get("dateTime") or end_obj.get("date")
             summary = event.get("summary", "Untitled event")
             location = event.get("location")
-            start_display = self._format_datetime(start)
-            end_display = self._format_datetime(end) if end else ""
+            start_display = _format_datetime(start)
+            end_display = _format_datetime(end) if end else ""
             entry = f"- {summary} on {start_display}"
             if end_display and end_display != start_display:
                 entry += f" until {end_display}"
@@ -403,66 +778,53 @@ class VoicePersonalAssistant:
 
         return "\n".join(lines)
 
-    def _format_datetime(self, value: Optional[str]) -> str:
-        if not value:
-            return "an unspecified time"
-        try:
-            return datetime.fromisoformat(value.replace("Z", "+00:00")).strftime("%b %d at %I:%M %p")
-        except ValueError:
-            return value
+    # Formerly a method; kept as an alias of the memoized module function.
+    _format_datetime = staticmethod(_format_datetime)
 
     def _sync_calendar_events(self, events: List[Dict[str, Any]]) -> None:
-        if not events:
+        # Keyed by external id: one upsert statement cannot touch the same row twice.
+        rows: Dict[str, Dict[str, Any]] = {}
+        for event in events:
+            external_id = event.get("id")
+            if not external_id:
+                continue
+            start_obj = event.get("start") or {}
+            end_obj = event.get("end") or {}
+            start = start_obj.get("dateTime") or start_obj.get("date")
+            end = end_obj.get("dateTime") or end_obj.get("date")
+            rows[external_id] = {
+                "user_id": self.user_id,
+                "external_id": external_id,
+                "title": event.get("summary", "Untitled event"),
+                "description": event.get("description"),
+                "start_time": self._parse_datetime(start) or datetime.utcnow(),
+                "end_time": self._parse_datetime(end) if end else None,
+            }
+        if not rows:
             return
         with self.db.get_session() as session:
-            for event in events:
-                external_id = event.get("id")
-                if not external_id:
-                    continue
-                start = event.get("start", {}).get("dateTime") or event.get("start", {}).get("date")
-                end = event.get("end", {}).get("dateTime") or event.get("end", {}).get("date")
-                start_dt = self._parse_datetime(start)
-                end_dt = self._parse_datetime(end) if end else None
-                record = (
-                    session.query(CalendarEvent)
-                    .filter_by(user_id=self.user_id, external_id=external_id)
-                    .one_or_none()
-                )
-                if record:
-                    record.title = event.get("summary", record.title)
-                    record.description = event.get("description", record.description)
-                    record.start_time = start_dt or record.start_time
-                    record.end_time = end_dt or record.end_time
-                else:
-                    session.add(
-                        CalendarEvent(
-                            user_id=self.user_id,
-                            external_id=external_id,
-                            title=event.get("summary", "Untitled event"),
-                            description=event.get("description"),
-                            start_time=start_dt or datetime.utcnow(),
-                            end_time=end_dt,
-                        )
-                    )
+            upsert_calendar_events(session, list(rows.values()))
 
     def _parse_datetime(self, value: Optional[str]) -> Optional[datetime]:
         if not value:
             return None
         try:
-            return datetime.fromisoformat(value.replace("Z", "+00:00"))
+            return _parse_iso(value)
         except ValueError:
             return None
 
     def _persist_conversation(
         self, transcription: str, response: str, intent: str, confidence: float
     ) -> None:
-        with self.db.get_session() as session:
-            session.add(
-                Conversation(
-                    user_id=self.user_id,
-                    user_message=transcription,
-                    ai_response=response,
-                    intent=intent,
-                    confidence=int(confidence * 100),
-                )
-            )
+        """Queue the turn for the background writer; never blocks the caller."""
+        get_conversation_writer().submit(
+            {
+                "user_id": self.user_id,
+                "user_message": transcription,
+                "ai_response": response,
+                "intent": intent,
+                "confidence": int(confidence * 100),
+                # Stamped now, not when the batch is flushed.
+                "timestamp": datetime.utcnow(),
+            }
+        )